@@ -1,44 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import List, Optional, Union
 
-from app.config.database import get_db
+from app.config.database import get_db, get_async_db, SessionLocal, ASYNC_DATABASE_URL
 from app.domain import schemas
 from app.cqrs import commands, queries
 from app.cqrs.handlers import CQRSHandler
+from app.cqrs.async_handlers import AsyncCQRSHandler, ThreadpoolCQRSHandler
+from app.services.quote_service import get_quote_service, normalize_symbols
 
 router = APIRouter()
 
+# Page size for GET /users/{user_id}/transactions when no limit is given
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Columns the transactions list can be sorted by, and how to parse their `after_value` cursor
+TRANSACTION_SORT_COLUMNS = {
+    "TransactionID": int,
+    "StockSymbol": str,
+    "Quantity": int,
+    "PricePerStock": Decimal,
+    "TransactionDate": datetime.fromisoformat,
+}
+# Most symbols accepted by one GET /quotes call
+MAX_QUOTE_SYMBOLS = 200
+
 def get_handler(db: Session = Depends(get_db)) -> CQRSHandler:
     return CQRSHandler(db)
 
+# Read endpoints, login and sign-up are async routes. With ASYNC_DATABASE_URL set they run on
+# the event loop through the async engine; by default they call the sync handler in the threadpool.
+# Other commands stay sync.
+ReadHandler = Union[AsyncCQRSHandler, ThreadpoolCQRSHandler]
+
+if ASYNC_DATABASE_URL:
+    def get_read_handler(db: AsyncSession = Depends(get_async_db)) -> ReadHandler:
+        return AsyncCQRSHandler(db)
+else:
+    def get_read_handler(handler: CQRSHandler = Depends(get_handler)) -> ReadHandler:
+        return ThreadpoolCQRSHandler(handler)
+
 # User Endpoints
 @router.post("/users", response_model=schemas.UserRead, status_code=201)
-def create_user(user: schemas.UserCreate, handler: CQRSHandler = Depends(get_handler)):
+async def create_user(user: schemas.UserCreate, handler: ReadHandler = Depends(get_read_handler)):
     command = commands.CreateUserCommand(
         Username=user.Username, 
         Email=user.Email,
         Password=user.Password
     )
-    return handler.handle_create_user(command)
+    # Async so that waiting on the argon2 process pool does not hold a threadpool slot
+    return await handler.handle_create_user(command)
 
 @router.post("/login", response_model=schemas.UserRead, status_code=200)
-def login_user(user: schemas.UserLogin, handler: CQRSHandler = Depends(get_handler)):
+async def login_user(user: schemas.UserLogin, handler: ReadHandler = Depends(get_read_handler)):
     command = commands.LoginUserCommand(
         Username=user.Username,
         Password=user.Password
     )
-    return handler.handle_login(command)
+    return await handler.handle_login(command)
 
 @router.get("/users", response_model=List[schemas.UserRead])
-def get_users(handler: CQRSHandler = Depends(get_handler)):
+async def get_users(handler: ReadHandler = Depends(get_read_handler)):
     query = queries.GetAllUsersQuery()
-    return handler.handle_get_all_users(query)
+    return await handler.handle_get_all_users(query)
 
 @router.get("/users/{user_id}", response_model=schemas.UserRead)
-def get_user(user_id: int, handler: CQRSHandler = Depends(get_handler)):
+async def get_user(user_id: int, handler: ReadHandler = Depends(get_read_handler)):
     query = queries.GetUserQuery(UserID=user_id)
-    return handler.handle_get_user(query)
+    return await handler.handle_get_user(query)
 
 @router.put("/users/{user_id}", response_model=schemas.UserRead)
 def update_user(user_id: int, user: schemas.UserUpdate, handler: CQRSHandler = Depends(get_handler)):
@@ -63,11 +96,112 @@ def create_transaction(transaction: schemas.TransactionCreate, handler: CQRSHand
     return handler.handle_create_transaction(command)
 
 @router.get("/transactions/{transaction_id}", response_model=schemas.TransactionRead)
-def get_transaction(transaction_id: int, handler: CQRSHandler = Depends(get_handler)):
+async def get_transaction(transaction_id: int, handler: ReadHandler = Depends(get_read_handler)):
     query = queries.GetTransactionQuery(TransactionID=transaction_id)
-    return handler.handle_get_transaction(query)
+    return await handler.handle_get_transaction(query)
 
 @router.get("/users/{user_id}/transactions", response_model=List[schemas.TransactionRead])
-def get_user_transactions(user_id: int, handler: CQRSHandler = Depends(get_handler)):
-    query = queries.GetUserTransactionsQuery(UserID=user_id)
-    return handler.handle_get_user_transactions(query)
+async def get_user_transactions(
+    user_id: int,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    stream: bool = False,
+    sort: str = Query("TransactionID", pattern="^(" + "|".join(TRANSACTION_SORT_COLUMNS) + ")$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    after_value: Optional[str] = None,
+    handler: ReadHandler = Depends(get_read_handler)
+):
+    """
+    Newest first (TransactionID DESC) unless `sort`/`order` say otherwise; ties are
+    broken by TransactionID. For the next page pass the last row's TransactionID as
+    `after_id`, plus its `sort` column value as `after_value` when sorting by another
+    column. With `stream=true` the rows are sent as NDJSON (one transaction per line)
+    and `limit` defaults to no limit.
+    """
+    after = None
+    if after_id is not None and sort != "TransactionID":
+        if after_value is None:
+            raise HTTPException(status_code=400, detail=f"after_value is required with after_id when sorting by {sort}")
+        try:
+            after = TRANSACTION_SORT_COLUMNS[sort](after_value)
+        except (ValueError, InvalidOperation):
+            raise HTTPException(status_code=400, detail=f"Invalid after_value for {sort}: {after_value}")
+
+    query = queries.GetUserTransactionsQuery(
+        UserID=user_id, AfterID=after_id, Limit=limit, SortBy=sort, Descending=order == "desc", AfterValue=after
+    )
+    if stream:
+        return StreamingResponse(_stream_transactions(query), media_type="application/x-ndjson")
+
+    query.Limit = limit or DEFAULT_PAGE_SIZE
+    return await handler.handle_get_user_transactions(query)
+
+def _stream_transactions(query: queries.GetUserTransactionsQuery):
+    # The stream outlives the request-scoped session, so it owns its own.
+    # StreamingResponse iterates this sync generator in the threadpool.
+    db = SessionLocal()
+    try:
+        for transaction in CQRSHandler(db).handle_stream_user_transactions(query):
+            yield schemas.TransactionRead.model_validate(transaction).model_dump_json() + "\n"
+    finally:
+        db.close()
+
+@router.get("/users/{user_id}/holdings", response_model=List[schemas.HoldingRead])
+async def get_user_holdings(user_id: int, symbol: Optional[str] = None, handler: ReadHandler = Depends(get_read_handler)):
+    query = queries.GetUserHoldingsQuery(UserID=user_id, StockSymbol=symbol)
+    return await handler.handle_get_user_holdings(query)
+
+@router.get("/users/{user_id}/portfolio/valuation", response_model=schemas.PortfolioValuation)
+async def get_portfolio_valuation(user_id: int, handler: ReadHandler = Depends(get_read_handler)):
+    """
+    Market value, average cost, unrealized P&L and weight of every open position,
+    priced from the shared quote cache. Positions without a quote have null values.
+    """
+    query = queries.GetPortfolioValuationQuery(UserID=user_id)
+    return await handler.handle_get_portfolio_valuation(query)
+
+@router.get("/users/{user_id}/portfolio/cost-basis", response_model=List[schemas.PositionCostBasis])
+async def get_user_cost_basis(
+    user_id: int,
+    method: str = Query("average", pattern="^(average|fifo)$"),
+    handler: ReadHandler = Depends(get_read_handler)
+):
+    """
+    Cost basis of the open position and realized P&L per symbol (closed positions
+    included), replayed from the ledger with the average-cost or FIFO method.
+    """
+    query = queries.GetUserCostBasisQuery(UserID=user_id, Method=method)
+    return await handler.handle_get_user_cost_basis(query)
+
+@router.get("/users/{user_id}/portfolio/history", response_model=schemas.PortfolioHistory)
+async def get_portfolio_history(
+    user_id: int,
+    period: str = "1y",
+    interval: str = "1d",
+    handler: ReadHandler = Depends(get_read_handler)
+):
+    """
+    Portfolio value at each daily (or weekly) close over the period, with the net cash
+    invested up to that point. Periods: 1mo, 3mo, 6mo, 1y, 2y, 5y. Intervals: 1d, 1wk.
+    """
+    query = queries.GetPortfolioHistoryQuery(UserID=user_id, Period=period, Interval=interval)
+    return await handler.handle_get_portfolio_history(query)
+
+# Quote Endpoints
+@router.get("/quotes", response_model=List[schemas.QuoteRead])
+async def get_quotes(symbols: str):
+    """
+    Last prices for a comma separated list of symbols, e.g. `?symbols=AAPL,MSFT`.
+    Served from the shared quote cache; symbols without a price are left out.
+    """
+    symbol_list = normalize_symbols(symbols.split(","))
+    if not symbol_list:
+        raise HTTPException(status_code=400, detail="No symbols given")
+    if len(symbol_list) > MAX_QUOTE_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_QUOTE_SYMBOLS} symbols per request")
+
+    quotes = await get_quote_service().get_quotes_async(symbol_list)
+    return [
+        schemas.QuoteRead(Symbol=symbol, Price=price, AsOf=as_of)
+        for symbol, (price, as_of) in quotes.items()
+    ]
@@ -0,0 +1,34 @@
+import asyncio
+import time
+from app.config.metrics import register_collector
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: how late a short sleep wakes up. Anything blocking the
+    loop (sync I/O, model inference) shows up here as lag, exported on GET /metrics.
+    """
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self.samples = 0
+        register_collector(self.metrics)
+
+    def metrics(self):
+        return {
+            "event_loop_lag_seconds": round(self.last_lag, 6),
+            "event_loop_lag_seconds_max": round(self.max_lag, 6),
+            "event_loop_lag_seconds_total": round(self.total_lag, 6),
+            "event_loop_lag_samples_total": self.samples,
+        }
+
+    async def run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - start - self.interval, 0.0)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self.total_lag += lag
+            self.samples += 1
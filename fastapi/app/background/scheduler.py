@@ -1,68 +1,130 @@
 from app.domain.models import SentimentAlert
 from datetime import datetime
 import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
 from app.services.portfolio_service import PortfolioService
 from app.services.news_service import NewsService
-from app.services.sentiment_service import SentimentService
 from app.config.database import SessionLocal
+from app.config.metrics import register_collector
 
 class BackgroundMonitor:
+    """
+    Periodic news-sentiment scan. Runs as a task on the API's event loop, but every
+    blocking stage (DB, yfinance, FinBERT) runs on a dedicated worker thread so HTTP
+    requests keep being served while a scan is in progress.
+    """
     def __init__(self):
         self.news_service = NewsService()
-        self.sentiment_service = SentimentService() # Will load model on first init
-    
+        self.sentiment_service = None # Loaded on the worker thread before the first scan
+        # One worker: stages of a scan run in order and never overlap with the next scan
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="risk-monitor")
+        self.scans = 0
+        self.last_scan_seconds = 0.0
+        register_collector(self.metrics)
+
+    def metrics(self):
+        return {
+            "risk_monitor_scans_total": self.scans,
+            "risk_monitor_last_scan_seconds": round(self.last_scan_seconds, 3),
+        }
+
+    async def run_blocking(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    def load_sentiment_service(self):
+        from app.services.sentiment_service import SentimentService
+        return SentimentService() # Will load model on first init
+
+    def get_active_tickers(self) -> List[str]:
+        db = SessionLocal()
+        try:
+            # Check for ALL unique stocks held by any user
+            return PortfolioService(db).get_all_active_stocks()
+        finally:
+            db.close()
+
+    def analyze(self, news_data: Dict[str, List[str]]) -> List[Tuple[str, str, float]]:
+        pairs = [(ticker, headline) for ticker, headlines in news_data.items() for headline in headlines]
+        # One batched FinBERT pass for every headline of the scan
+        scores = self.sentiment_service.analyze_batch([headline for _, headline in pairs])
+        return [(ticker, headline, score) for (ticker, headline), score in zip(pairs, scores)]
+
+    def save_alerts(self, alerts: List[Tuple[str, str, float]]):
+        db = SessionLocal()
+        try:
+            # Every scan sees the same top headlines again - only store ones not alerted yet
+            # (the unique index on SentimentAlerts enforces this as well)
+            candidates = {(ticker, headline): score for ticker, headline, score in alerts}
+            existing = set(
+                db.query(SentimentAlert.stock_symbol, SentimentAlert.headline)
+                .filter(SentimentAlert.headline.in_([headline for _, headline in candidates]))
+                .all()
+            )
+            for (ticker, headline), score in candidates.items():
+                if (ticker, headline) in existing:
+                    continue
+                db.add(SentimentAlert(
+                    stock_symbol=ticker,
+                    sentiment_score=score,
+                    headline=headline,
+                    timestamp=datetime.utcnow(),
+                    is_read=0
+                ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def scan(self):
+        # 1. Get Active Stocks
+        active_tickers = await self.run_blocking(self.get_active_tickers)
+
+        if not active_tickers:
+            print("No active stocks found to monitor.")
+            return
+
+        print(f"Monitoring stocks: {active_tickers}")
+
+        # 2. Get News
+        news_data = await self.run_blocking(self.news_service.fetch_news, active_tickers)
+
+        # 3. Analyze Risks
+        scored = await self.run_blocking(self.analyze, news_data)
+
+        alerts = []
+        for ticker, headline, score in scored:
+            # Log risk if significantly negative
+            if score < -0.7:
+                print(f"⚠️ [RISK ALERT] {ticker}: Sentiment {score:.2f} | Headline: {headline}")
+                alerts.append((ticker, headline, score))
+            elif score > 0.7:
+                print(f"✅ [OPPORTUNITY] {ticker}: Sentiment {score:.2f} | Headline: {headline}")
+
+        # 4. Save to DB
+        if alerts:
+            await self.run_blocking(self.save_alerts, alerts)
+
     async def start_monitoring(self):
         # Allow the server to start up fully before heavy loading
-        await asyncio.sleep(10) 
+        await asyncio.sleep(10)
         print("Starting Background Risk Monitor...")
-        
+
+        self.sentiment_service = await self.run_blocking(self.load_sentiment_service)
+
         while True:
+            start = time.perf_counter()
             try:
-                # 1. Get Active Stocks
-                db = SessionLocal()
-                # Check for ALL unique stocks held by any user
-                active_tickers = PortfolioService(db).get_all_active_stocks()
-                
-                if not active_tickers:
-                    print("No active stocks found to monitor.")
-                else:
-                    print(f"Monitoring stocks: {active_tickers}")
-                    
-                    # 2. Get News
-                    news_data = self.news_service.fetch_news(active_tickers)
-                    
-                    # 3. Analyze Risks
-                    for ticker, headlines in news_data.items():
-                        for headline in headlines:
-                            score = self.sentiment_service.analyze(headline)
-                            
-                            # Log risk if significantly negative
-                            if score < -0.7:
-                                print(f"⚠️ [RISK ALERT] {ticker}: Sentiment {score:.2f} | Headline: {headline}")
-                                
-                                # Save to DB
-                                alert = SentimentAlert(
-                                    stock_symbol=ticker,
-                                    sentiment_score=score,
-                                    headline=headline,
-                                    timestamp=datetime.utcnow(),
-                                    is_read=0
-                                )
-                                db.add(alert)
-                                db.commit()
-                                
-                            elif score > 0.7:
-                                print(f"✅ [OPPORTUNITY] {ticker}: Sentiment {score:.2f} | Headline: {headline}")
-                
-                db.close()
-
+                await self.scan()
             except Exception as e:
                 print(f"Error in background monitor: {e}")
-                if 'db' in locals():
-                    db.close()
 
-            except Exception as e:
-                print(f"Error in background monitor: {e}")
+            self.scans += 1
+            self.last_scan_seconds = time.perf_counter() - start
 
             # Wait 15 minutes before next scan (900 seconds)
             # Shortened to 60s for demo purposes
@@ -1,8 +1,14 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as SATimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
 import urllib.parse
 import os
+import threading
+import time
 from dotenv import load_dotenv
+from app.config.metrics import register_collector
 
 load_dotenv()
 
@@ -26,7 +32,102 @@ db_pwd = os.getenv('DB_PWD')
 # pymssql format: mssql+pymssql://<username>:<password>@<host>/<dbname>
 DATABASE_URL = f"mssql+pymssql://{db_uid}:{db_pwd}@{db_server}/{db_name}"
 
-engine = create_engine(DATABASE_URL, echo=True)
+# Optional async engine for the read endpoints, login and sign-up. pymssql has no asyncio
+# support and pyodbc fails with the installed ODBC driver (see above), so it is off unless
+# ASYNC_DATABASE_URL names a working async driver, e.g.
+# mssql+aioodbc:///?odbc_connect=... with ODBC Driver 17/18. Without it every route runs on
+# the sync engine.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+# The server runs as a single process (see run.py), so it opens at most
+# DB_POOL_SIZE + DB_MAX_OVERFLOW connections (plus the same again for the async engine).
+DB_ECHO = _env_bool("DB_ECHO", False)
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 10)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 20)
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30) # Seconds to wait for a free connection
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800) # Seconds before a connection is replaced
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+
+
+class PoolStats:
+    """
+    Counters for the connection pool, exported on GET /metrics.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.connections_created = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float):
+        with self.lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that measures how long each checkout waits for a connection.
+    """
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except SATimeoutError:
+            with pool_stats.lock:
+                pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.record_wait(time.perf_counter() - start)
+
+
+engine = create_engine(
+    DATABASE_URL,
+    echo=DB_ECHO,
+    poolclass=InstrumentedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+@event.listens_for(engine, "connect")
+def _count_new_connection(dbapi_connection, connection_record):
+    with pool_stats.lock:
+        pool_stats.connections_created += 1
+
+def _pool_metrics():
+    pool = engine.pool
+    return {
+        "db_pool_size": DB_POOL_SIZE,
+        "db_pool_max_overflow": DB_MAX_OVERFLOW,
+        "db_pool_checked_out": pool.checkedout(),
+        "db_pool_checked_in": pool.checkedin(),
+        "db_pool_overflow": max(pool.overflow(), 0),
+        "db_pool_checkouts_total": pool_stats.checkouts,
+        "db_pool_connections_created_total": pool_stats.connections_created,
+        "db_pool_timeouts_total": pool_stats.timeouts,
+        "db_pool_wait_seconds_total": round(pool_stats.wait_seconds_total, 6),
+        "db_pool_wait_seconds_max": round(pool_stats.wait_seconds_max, 6),
+    }
+
+register_collector(_pool_metrics)
 
 # Event listeners for pyodbc are typically not needed for pymssql 
 # unless encoding issues arise (pymssql usually handles UTF-8 well by default)
@@ -34,6 +135,41 @@ engine = create_engine(DATABASE_URL, echo=True)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Created on first use, so importing this module never needs the async driver
+_async_engine = None
+_async_sessionmaker = None
+_async_engine_lock = threading.Lock()
+
+def get_async_sessionmaker():
+    global _async_engine, _async_sessionmaker
+    if not ASYNC_DATABASE_URL:
+        raise RuntimeError("ASYNC_DATABASE_URL is not set")
+    with _async_engine_lock:
+        if _async_sessionmaker is None:
+            _async_engine = create_async_engine(
+                ASYNC_DATABASE_URL,
+                echo=DB_ECHO,
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT,
+                pool_recycle=DB_POOL_RECYCLE,
+                pool_pre_ping=DB_POOL_PRE_PING,
+            )
+            _async_sessionmaker = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+        return _async_sessionmaker
+
+def _async_pool_metrics():
+    if _async_engine is None:
+        return {}
+    pool = _async_engine.pool
+    return {
+        "db_async_pool_checked_out": pool.checkedout(),
+        "db_async_pool_checked_in": pool.checkedin(),
+        "db_async_pool_overflow": max(pool.overflow(), 0),
+    }
+
+register_collector(_async_pool_metrics)
+
 Base = declarative_base()
 
 def get_db():
@@ -42,3 +178,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
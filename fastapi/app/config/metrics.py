@@ -0,0 +1,23 @@
+from typing import Callable, Dict, List
+
+# Tiny in-process metrics registry rendered by GET /metrics (Prometheus text format).
+# The server runs as one process (see run.py), so these are the whole server's values.
+_collectors: List[Callable[[], Dict[str, float]]] = []
+
+def register_collector(collector: Callable[[], Dict[str, float]]):
+    """
+    Registers a function returning {metric_name: value}. It is called on every scrape.
+    """
+    _collectors.append(collector)
+
+def collect() -> Dict[str, float]:
+    values: Dict[str, float] = {}
+    for collector in _collectors:
+        try:
+            values.update(collector())
+        except Exception as e:
+            print(f"Error collecting metrics: {e}")
+    return values
+
+def render_prometheus() -> str:
+    return "".join(f"{name} {value}\n" for name, value in sorted(collect().items()))
@@ -0,0 +1,47 @@
+from typing import Callable, Dict, List
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from app.config.database import engine, Base
+
+def _dedupe_sentiment_alerts(bind: Engine):
+    # Keep the oldest alert per (stock_symbol, headline) so the unique index can be built
+    with bind.begin() as conn:
+        result = conn.execute(text(
+            "DELETE FROM SentimentAlerts WHERE id NOT IN ("
+            "SELECT MIN(id) FROM SentimentAlerts GROUP BY stock_symbol, headline)"
+        ))
+        if result.rowcount:
+            print(f"Removed {result.rowcount} duplicate sentiment alerts.")
+
+# Data fixes that must run before an index can be created on existing data
+PRE_INDEX_STEPS: Dict[str, Callable[[Engine], None]] = {
+    "UX_SentimentAlerts_stock_symbol_headline": _dedupe_sentiment_alerts,
+}
+
+def run_migrations(bind: Engine = engine) -> List[str]:
+    """
+    Brings an existing database up to date with the indexes declared on the models.
+    Base.metadata.create_all only creates missing tables, so indexes added to a
+    table that already exists are created here instead. Safe to run repeatedly.
+    Returns the names of the indexes that were created.
+    """
+    # Import the models so Base knows about every table
+    from app.domain import models
+
+    inspector = inspect(bind)
+    created = []
+
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue # New tables (and their indexes) are created by create_all
+
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                if index.name in PRE_INDEX_STEPS:
+                    PRE_INDEX_STEPS[index.name](bind)
+                print(f"Creating index {index.name} on {table.name}...")
+                index.create(bind)
+                created.append(index.name)
+
+    return created
@@ -0,0 +1,144 @@
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+from app.domain import models, schemas
+from app.cqrs import commands, queries
+from app.cqrs.handlers import (
+    CQRSHandler, new_user, user_transactions_clauses, user_holdings_statement, open_positions_statement, portfolio_valuation,
+    check_cost_basis_query, ledger_by_symbol_statement, position_cost_basis,
+    check_history_query, ledger_trades_statement, portfolio_history,
+)
+from app.services import password_service
+from app.services.quote_service import get_quote_service
+from app.services.history_service import get_history_service
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
+
+class AsyncUserCommands:
+    """
+    Sign-up and login for the async routes. The argon2 work is awaited on the event loop
+    (it runs in password_service's process pool), so a slow hash never holds a threadpool
+    worker; subclasses provide the awaitable add_user / find_user_by_username.
+    """
+    async def handle_create_user(self, command: commands.CreateUserCommand) -> models.User:
+        db_user = new_user(command, await password_service.hash_password_async(command.Password))
+        return await self.add_user(db_user)
+
+    async def handle_login(self, command: commands.LoginUserCommand) -> models.User:
+        db_user = await self.find_user_by_username(command.Username)
+        if not db_user or not await password_service.verify_password_async(command.Password, db_user.HashedPassword):
+            raise HTTPException(status_code=401, detail="Invalid username or password")
+        return db_user
+
+
+class AsyncCQRSHandler(AsyncUserCommands):
+    """
+    Async counterpart of CQRSHandler for the read side and the password-hashing commands.
+    Handlers await the database (and the hashing pool) on the event loop instead of
+    blocking a threadpool worker.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add_user(self, db_user: models.User) -> models.User:
+        try:
+            self.db.add(db_user)
+            await self.db.commit()
+            await self.db.refresh(db_user)
+            return db_user
+        except IntegrityError as e:
+            await self.db.rollback()
+            print(f"Integrity Error: {e}")
+            raise HTTPException(status_code=400, detail="Username or Email already exists")
+
+    async def find_user_by_username(self, username: str) -> Optional[models.User]:
+        db_user = await self.db.scalar(select(models.User).where(models.User.Username == username))
+        # Return the connection to the pool before the caller waits on the password check
+        if db_user:
+            self.db.expunge(db_user)
+        await self.db.rollback()
+        return db_user
+
+    # Query Handlers
+    async def handle_get_user(self, query: queries.GetUserQuery) -> models.User:
+        user = await self.db.get(models.User, query.UserID)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return user
+
+    async def handle_get_all_users(self, query: queries.GetAllUsersQuery) -> List[models.User]:
+        result = await self.db.scalars(select(models.User))
+        return list(result.all())
+
+    async def handle_get_transaction(self, query: queries.GetTransactionQuery) -> models.Transaction:
+        transaction = await self.db.get(models.Transaction, query.TransactionID)
+        if not transaction:
+             raise HTTPException(status_code=404, detail="Transaction not found")
+        return transaction
+
+    async def handle_get_user_transactions(self, query: queries.GetUserTransactionsQuery) -> List[models.Transaction]:
+        conditions, order_by = user_transactions_clauses(query)
+        stmt = select(models.Transaction).where(*conditions).order_by(*order_by)
+        if query.Limit is not None:
+            stmt = stmt.limit(query.Limit)
+
+        result = await self.db.scalars(stmt)
+        return list(result.all())
+
+    async def handle_get_user_holdings(self, query: queries.GetUserHoldingsQuery) -> List[schemas.HoldingRead]:
+        result = await self.db.execute(user_holdings_statement(query))
+        return [schemas.HoldingRead(StockSymbol=row.StockSymbol, Quantity=row.Quantity) for row in result]
+
+    async def handle_get_portfolio_valuation(self, query: queries.GetPortfolioValuationQuery) -> schemas.PortfolioValuation:
+        if not await self.db.get(models.User, query.UserID):
+            raise HTTPException(status_code=404, detail="User not found")
+
+        rows = (await self.db.execute(open_positions_statement(query.UserID))).all()
+        # One batched lookup through the shared TTL quote cache
+        quotes = await get_quote_service().get_quotes_async([row[0] for row in rows]) if rows else {}
+        return portfolio_valuation(query.UserID, rows, quotes)
+
+    async def handle_get_user_cost_basis(self, query: queries.GetUserCostBasisQuery) -> List[schemas.PositionCostBasis]:
+        check_cost_basis_query(query)
+        rows = (await self.db.execute(ledger_by_symbol_statement(query.UserID))).all()
+        return position_cost_basis(rows, query.Method)
+
+    async def handle_get_portfolio_history(self, query: queries.GetPortfolioHistoryQuery) -> schemas.PortfolioHistory:
+        check_history_query(query)
+        if not await self.db.get(models.User, query.UserID):
+            raise HTTPException(status_code=404, detail="User not found")
+
+        service = get_history_service()
+        curve = service.get_cached(query.UserID, query.Period)
+        if curve is None:
+            version = service.version(query.UserID)
+            rows = (await self.db.execute(ledger_trades_statement(query.UserID))).all()
+            if not rows:
+                return schemas.PortfolioHistory(UserID=query.UserID, Period=query.Period, Interval=query.Interval)
+            # Fetching closes can block on Yahoo
+            curve = await run_in_threadpool(service.build, query.UserID, query.Period, version, *zip(*rows))
+        return portfolio_history(query, curve)
+
+
+class ThreadpoolCQRSHandler(AsyncUserCommands):
+    """
+    Awaitable view of a CQRSHandler for the async routes when no async engine is
+    configured: each handle_* call runs on the sync session in the threadpool, except
+    sign-up and login, which only send their database steps there.
+    """
+    def __init__(self, handler: CQRSHandler):
+        self.handler = handler
+
+    async def add_user(self, db_user: models.User) -> models.User:
+        return await run_in_threadpool(self.handler.add_user, db_user)
+
+    async def find_user_by_username(self, username: str) -> Optional[models.User]:
+        return await run_in_threadpool(self.handler.find_user_by_username, username)
+
+    def __getattr__(self, name):
+        method = getattr(self.handler, name)
+
+        async def call(*args, **kwargs):
+            return await run_in_threadpool(method, *args, **kwargs)
+        return call
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from decimal import Decimal
+from typing import Optional
 
 @dataclass
 class CreateUserCommand:
@@ -28,3 +29,7 @@ class CreateTransactionCommand:
 class LoginUserCommand:
     Username: str
     Password: str
+
+@dataclass
+class RebuildHoldingsCommand:
+    UserID: Optional[int] = None # None rebuilds every user
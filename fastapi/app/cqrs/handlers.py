@@ -1,62 +1,204 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import Float, and_, cast, func, or_, select
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
-from app.domain import models
+from app.domain import models, schemas
 from app.cqrs import commands, queries
-from typing import List
+from app.services.holdings_service import HoldingsService
+from app.services.history_service import get_history_service, EquityCurve, PERIODS, INTERVALS
+from app.services.quote_service import get_quote_service
+from app.services.valuation_service import value_positions
+from app.services.lot_engine import replay_trades
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+import math
+import numpy as np
+
+def user_transactions_clauses(query: queries.GetUserTransactionsQuery):
+    """
+    WHERE conditions and ORDER BY of a page of a user's transactions. Rows are ordered
+    by SortBy with TransactionID breaking ties, so (AfterValue, AfterID) of the last row
+    of a page is a keyset cursor for the next one.
+    """
+    transaction_id = models.Transaction.TransactionID
+    column = getattr(models.Transaction, query.SortBy)
+    conditions = [models.Transaction.UserID == query.UserID]
+
+    if query.AfterID is not None:
+        after = (lambda c, v: c < v) if query.Descending else (lambda c, v: c > v)
+        if column is transaction_id:
+            conditions.append(after(transaction_id, query.AfterID))
+        else:
+            conditions.append(or_(
+                after(column, query.AfterValue),
+                and_(column == query.AfterValue, after(transaction_id, query.AfterID)),
+            ))
+
+    if column is transaction_id:
+        order_by = [transaction_id.desc() if query.Descending else transaction_id.asc()]
+    elif query.Descending:
+        order_by = [column.desc(), transaction_id.desc()]
+    else:
+        order_by = [column.asc(), transaction_id.asc()]
+    return conditions, order_by
+
+# Statements and result builders shared by CQRSHandler and AsyncCQRSHandler, which only
+# differ in how they run the statements.
+
+def new_user(command: commands.CreateUserCommand, hashed_password: str) -> models.User:
+    return models.User(
+        Username=command.Username,
+        Email=command.Email,
+        HashedPassword=hashed_password,
+        Balance=0.00
+    )
+
+def user_holdings_statement(query: queries.GetUserHoldingsQuery):
+    """Open positions summed from the ledger, optionally for one symbol."""
+    # Older ledger rows may hold lower-case symbols, so group on the upper-cased symbol
+    symbol = func.upper(models.Transaction.StockSymbol)
+    total_quantity = func.sum(models.Transaction.Quantity)
+    stmt = (
+        select(symbol.label("StockSymbol"), total_quantity.label("Quantity"))
+        .where(models.Transaction.UserID == query.UserID)
+    )
+    if query.StockSymbol:
+        stmt = stmt.where(symbol == query.StockSymbol.strip().upper())
+    return stmt.group_by(symbol).having(total_quantity > 0).order_by(symbol)
+
+def open_positions_statement(user_id: int):
+    # Open positions and their cost come from the Holdings read model (kept in step with the ledger)
+    return (
+        select(models.Holding.StockSymbol, models.Holding.Quantity, cast(models.Holding.CostBasis, Float))
+        .where(models.Holding.UserID == user_id, models.Holding.Quantity > 0)
+        .order_by(models.Holding.StockSymbol)
+    )
+
+def portfolio_valuation(user_id: int, rows, quotes: Dict[str, Tuple[float, datetime]]) -> schemas.PortfolioValuation:
+    """
+    Values the (StockSymbol, Quantity, CostBasis) rows of open_positions_statement
+    with quotes from the quote service.
+    """
+    symbols, quantities, cost_basis = map(list, zip(*rows)) if rows else ([], [], [])
+    prices = [quotes[symbol][0] if symbol in quotes else math.nan for symbol in symbols]
+    values = value_positions(quantities, cost_basis, prices)
+
+    def column(array):
+        # NaN (no quote) -> None
+        return np.where(np.isnan(array), None, array).tolist()
+
+    # Plain dicts, validated in one model_validate call below (much cheaper than a model per row)
+    positions = [
+        {
+            "StockSymbol": symbol,
+            "Quantity": quantity,
+            "Price": price,
+            "MarketValue": market_value,
+            "AverageCost": average_cost,
+            "CostBasis": cost,
+            "UnrealizedPnL": pnl,
+            "Weight": weight,
+        }
+        for symbol, quantity, price, market_value, average_cost, cost, pnl, weight in zip(
+            symbols, quantities, column(np.asarray(prices)), column(values["market_value"]),
+            values["average_cost"].tolist(), values["cost_basis"].tolist(),
+            column(values["unrealized_pnl"]), column(values["weight"]),
+        )
+    ]
+    return schemas.PortfolioValuation.model_validate({
+        "UserID": user_id,
+        "AsOf": min((as_of for _, as_of in quotes.values()), default=datetime.utcnow()),
+        "TotalMarketValue": float(values["total_market_value"]),
+        "TotalCostBasis": float(values["total_cost_basis"]),
+        "TotalUnrealizedPnL": float(values["total_unrealized_pnl"]),
+        "Positions": positions,
+    })
+
+def check_cost_basis_query(query: queries.GetUserCostBasisQuery):
+    if query.Method not in ("average", "fifo"):
+        raise HTTPException(status_code=400, detail="Method must be 'average' or 'fifo'")
+
+def ledger_by_symbol_statement(user_id: int):
+    # The lot engine needs the whole ledger grouped by symbol in ledger order; older rows may
+    # hold lower-case symbols, so they are grouped under the upper-cased symbol
+    symbol = func.upper(models.Transaction.StockSymbol)
+    return (
+        select(symbol.label("StockSymbol"), models.Transaction.Quantity, cast(models.Transaction.PricePerStock, Float))
+        .where(models.Transaction.UserID == user_id)
+        .order_by(symbol, models.Transaction.TransactionID)
+    )
+
+def position_cost_basis(rows, method: str) -> List[schemas.PositionCostBasis]:
+    """Replays the rows of ledger_by_symbol_statement with the average-cost or FIFO method."""
+    if not rows:
+        return []
+    symbols, quantities, prices = zip(*rows)
+    lots = replay_trades(symbols, quantities, prices)
+
+    if method == "fifo":
+        cost_basis, realized = lots["fifo_cost_basis"], lots["fifo_realized_pnl"]
+        quantity = lots["quantity"]
+        average_cost = np.divide(cost_basis, quantity, out=np.zeros_like(cost_basis), where=quantity > 0)
+    else:
+        cost_basis, realized, average_cost = lots["cost_basis"], lots["realized_pnl"], lots["average_cost"]
+
+    return [
+        schemas.PositionCostBasis(StockSymbol=symbol, Quantity=quantity, AverageCost=average, CostBasis=cost, RealizedPnL=pnl)
+        for symbol, quantity, average, cost, pnl in zip(
+            lots["symbols"].tolist(), lots["quantity"].tolist(),
+            average_cost.tolist(), cost_basis.tolist(), realized.tolist(),
+        )
+    ]
+
+def check_history_query(query: queries.GetPortfolioHistoryQuery):
+    if query.Period not in PERIODS or query.Interval not in INTERVALS:
+        raise HTTPException(status_code=400, detail=f"Period must be one of {PERIODS} and interval one of {list(INTERVALS)}")
+
+def ledger_trades_statement(user_id: int):
+    # Upper-cased so older lower-case rows join the same series (and close lookup) as the rest
+    return select(
+        func.upper(models.Transaction.StockSymbol).label("StockSymbol"), models.Transaction.Quantity,
+        cast(models.Transaction.PricePerStock, Float), models.Transaction.TransactionDate
+    ).where(models.Transaction.UserID == user_id)
+
+def portfolio_history(query: queries.GetPortfolioHistoryQuery, curve: EquityCurve) -> schemas.PortfolioHistory:
+    points = get_history_service().to_points(curve, query.Interval)
+    return schemas.PortfolioHistory.model_validate({
+        "UserID": query.UserID,
+        "Period": query.Period,
+        "Interval": query.Interval,
+        "Points": [
+            {"Date": date, "Value": value, "Invested": invested}
+            for date, value, invested in zip(points.index.to_pydatetime(), points["Value"].tolist(), points["Invested"].tolist())
+        ],
+    })
 
 class CQRSHandler:
     def __init__(self, db: Session):
         self.db = db
 
-    # Command Handlers
-    def handle_create_user(self, command: commands.CreateUserCommand) -> models.User:
-        try:
-            from passlib.context import CryptContext
-            # Switching to argon2 to avoid 72 byte limit of bcrypt and for better security
-            pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
-            hashed_password = pwd_context.hash(command.Password)
-        except Exception as e:
-            print(f"Hashing Error: {e}")
-            import traceback
-            traceback.print_exc()
-            raise HTTPException(status_code=500, detail=f"Hashing failed: {str(e)}")
-
-        db_user = models.User(
-            Username=command.Username, 
-            Email=command.Email,
-            HashedPassword=hashed_password,
-            Balance=0.00
-        )
+    # User storage for the sign-up and login commands. Passwords are hashed on the event loop
+    # (see AsyncUserCommands), so a threadpool worker only ever waits on the database here.
+    def add_user(self, db_user: models.User) -> models.User:
         try:
             self.db.add(db_user)
             self.db.commit()
-            print("Committed user to DB")
             self.db.refresh(db_user)
             return db_user
         except IntegrityError as e:
             self.db.rollback()
             print(f"Integrity Error: {e}")
             raise HTTPException(status_code=400, detail="Username or Email already exists")
-            print(f"DB Error: {e}")
-            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-    def handle_login(self, command: commands.LoginUserCommand) -> models.User:
-        db_user = self.db.query(models.User).filter(models.User.Username == command.Username).first()
-        if not db_user:
-             raise HTTPException(status_code=401, detail="Invalid username or password")
-        
-        try:
-             from passlib.context import CryptContext
-             pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
-             if not pwd_context.verify(command.Password, db_user.HashedPassword):
-                 raise HTTPException(status_code=401, detail="Invalid username or password")
-        except Exception as e:
-            print(f"Login Verify Error: {e}")
-            raise HTTPException(status_code=500, detail="Authentication failed")
-        
+    def find_user_by_username(self, username: str) -> Optional[models.User]:
+        db_user = self.db.query(models.User).filter(models.User.Username == username).first()
+        # Return the connection to the pool before the caller waits on the password check
+        if db_user:
+            self.db.expunge(db_user)
+        self.db.rollback()
         return db_user
 
+    # Command Handlers
     def handle_update_user(self, command: commands.UpdateUserCommand) -> models.User:
         db_user = self.db.query(models.User).filter(models.User.UserID == command.UserID).first()
         if not db_user:
@@ -87,6 +229,7 @@ class CQRSHandler:
         if not user:
              raise HTTPException(status_code=404, detail="User not found")
 
+        symbol = command.StockSymbol.strip().upper() # One spelling per symbol in the ledger and Holdings
         total_amount = command.Quantity * command.PricePerStock
 
         # Handle Balance Logic
@@ -102,21 +245,39 @@ class CQRSHandler:
 
         db_transaction = models.Transaction(
             UserID=command.UserID,
-            StockSymbol=command.StockSymbol,
+            StockSymbol=symbol,
             Quantity=command.Quantity,
             PricePerStock=command.PricePerStock
         )
         
         try:
             self.db.add(db_transaction)
-            self.db.commit() # Commit transaction and user balance update atomically
+            HoldingsService(self.db).apply_transaction(
+                command.UserID, symbol, command.Quantity, command.PricePerStock
+            )
+            self.db.commit() # Commit transaction, holdings and user balance update atomically
             self.db.refresh(db_transaction)
-            return db_transaction
         except Exception as e:
             self.db.rollback()
             print(f"Transaction Error: {e}")
             raise HTTPException(status_code=500, detail=f"Transaction failed: {str(e)}")
 
+        try:
+            get_history_service().on_transaction(
+                db_transaction.UserID, db_transaction.StockSymbol, db_transaction.Quantity,
+                float(db_transaction.PricePerStock), db_transaction.TransactionDate
+            )
+        except Exception as e:
+            print(f"Portfolio history cache update failed: {e}")
+        return db_transaction
+
+    def handle_rebuild_holdings(self, command: commands.RebuildHoldingsCommand) -> int:
+        try:
+            return HoldingsService(self.db).rebuild(command.UserID)
+        except Exception as e:
+            print(f"Holdings Rebuild Error: {e}")
+            raise HTTPException(status_code=500, detail=f"Holdings rebuild failed: {str(e)}")
+
     # Query Handlers
     def handle_get_user(self, query: queries.GetUserQuery) -> models.User:
         user = self.db.query(models.User).filter(models.User.UserID == query.UserID).first()
@@ -133,5 +294,53 @@ class CQRSHandler:
              raise HTTPException(status_code=404, detail="Transaction not found")
         return transaction
     
+    def _user_transactions_query(self, query: queries.GetUserTransactionsQuery):
+        conditions, order_by = user_transactions_clauses(query)
+        db_query = self.db.query(models.Transaction).filter(*conditions).order_by(*order_by)
+        if query.Limit is not None:
+            db_query = db_query.limit(query.Limit)
+        return db_query
+
     def handle_get_user_transactions(self, query: queries.GetUserTransactionsQuery) -> List[models.Transaction]:
-        return self.db.query(models.Transaction).filter(models.Transaction.UserID == query.UserID).all()
+        return self._user_transactions_query(query).all()
+
+    def handle_stream_user_transactions(self, query: queries.GetUserTransactionsQuery, batch_size: int = 1000) -> Iterator[models.Transaction]:
+        """
+        Yields the same rows as handle_get_user_transactions from a server-side cursor,
+        so the full history is never loaded into memory at once.
+        """
+        db_query = self._user_transactions_query(query).execution_options(stream_results=True)
+        yield from db_query.yield_per(batch_size)
+
+    def handle_get_user_holdings(self, query: queries.GetUserHoldingsQuery) -> List[schemas.HoldingRead]:
+        rows = self.db.execute(user_holdings_statement(query))
+        return [schemas.HoldingRead(StockSymbol=row.StockSymbol, Quantity=row.Quantity) for row in rows]
+
+    def handle_get_portfolio_valuation(self, query: queries.GetPortfolioValuationQuery) -> schemas.PortfolioValuation:
+        if not self.db.get(models.User, query.UserID):
+            raise HTTPException(status_code=404, detail="User not found")
+
+        rows = self.db.execute(open_positions_statement(query.UserID)).all()
+        # One batched lookup through the shared TTL quote cache
+        quotes = get_quote_service().get_quotes([row[0] for row in rows]) if rows else {}
+        return portfolio_valuation(query.UserID, rows, quotes)
+
+    def handle_get_user_cost_basis(self, query: queries.GetUserCostBasisQuery) -> List[schemas.PositionCostBasis]:
+        check_cost_basis_query(query)
+        rows = self.db.execute(ledger_by_symbol_statement(query.UserID)).all()
+        return position_cost_basis(rows, query.Method)
+
+    def handle_get_portfolio_history(self, query: queries.GetPortfolioHistoryQuery) -> schemas.PortfolioHistory:
+        check_history_query(query)
+        if not self.db.get(models.User, query.UserID):
+            raise HTTPException(status_code=404, detail="User not found")
+
+        service = get_history_service()
+        curve = service.get_cached(query.UserID, query.Period)
+        if curve is None:
+            version = service.version(query.UserID)
+            rows = self.db.execute(ledger_trades_statement(query.UserID)).all()
+            if not rows:
+                return schemas.PortfolioHistory(UserID=query.UserID, Period=query.Period, Interval=query.Interval)
+            curve = service.build(query.UserID, query.Period, version, *zip(*rows))
+        return portfolio_history(query, curve)
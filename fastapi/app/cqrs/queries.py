@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional
 
 @dataclass
 class GetUserQuery:
@@ -16,3 +16,28 @@ class GetTransactionQuery:
 @dataclass
 class GetUserTransactionsQuery:
     UserID: int
+    AfterID: Optional[int] = None # Keyset cursor: only rows after this TransactionID in the sort order
+    Limit: Optional[int] = None # None returns every remaining row
+    SortBy: str = "TransactionID" # TransactionID, StockSymbol, Quantity, PricePerStock or TransactionDate
+    Descending: bool = True
+    AfterValue: Optional[Any] = None # SortBy value of the AfterID row (cursor for sorts other than TransactionID)
+
+@dataclass
+class GetUserHoldingsQuery:
+    UserID: int
+    StockSymbol: Optional[str] = None
+
+@dataclass
+class GetPortfolioValuationQuery:
+    UserID: int
+
+@dataclass
+class GetUserCostBasisQuery:
+    UserID: int
+    Method: str = "average" # "average" or "fifo"
+
+@dataclass
+class GetPortfolioHistoryQuery:
+    UserID: int
+    Period: str = "1y"
+    Interval: str = "1d"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import Column, Integer, String, DECIMAL, DateTime, ForeignKey, CheckConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.config.database import Base
@@ -13,6 +13,7 @@ class User(Base):
     Balance = Column(DECIMAL(18, 2), default=0.00)
 
     transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan")
+    holdings = relationship("Holding", back_populates="user", cascade="all, delete-orphan")
 
 class Transaction(Base):
     __tablename__ = "Transactions"
@@ -26,6 +27,30 @@ class Transaction(Base):
 
     user = relationship("User", back_populates="transactions")
 
+    # Hot paths: per-user history paged by TransactionID, and per-user SUM(Quantity) GROUP BY StockSymbol.
+    # History sorted by another column is sorted from the (UserID, TransactionID) range; an index per
+    # sortable column would slow every insert to speed up an occasional header click.
+    # Existing databases get these through app.config.migrations (create_all skips existing tables).
+    __table_args__ = (
+        Index("IX_Transactions_UserID_TransactionID", "UserID", "TransactionID"),
+        Index("IX_Transactions_UserID_StockSymbol", "UserID", "StockSymbol", mssql_include=["Quantity"]),
+    )
+
+class Holding(Base):
+    """
+    Read model of the current position per user and symbol.
+    Maintained incrementally by CQRSHandler.handle_create_transaction and
+    rebuilt from the Transactions ledger by HoldingsService.rebuild.
+    """
+    __tablename__ = "Holdings"
+
+    UserID = Column(Integer, ForeignKey("Users.UserID"), primary_key=True)
+    StockSymbol = Column(String(10), primary_key=True)
+    Quantity = Column(Integer, nullable=False, default=0)
+    CostBasis = Column(DECIMAL(18, 4), nullable=False, default=0) # Total cost of the open (long) position
+
+    user = relationship("User", back_populates="holdings")
+
 class SentimentAlert(Base):
     __tablename__ = "SentimentAlerts"
 
@@ -36,3 +61,21 @@ class SentimentAlert(Base):
     timestamp = Column(DateTime, default=datetime.utcnow)
     is_read = Column(Integer, default=0) # Using Integer as boolean (0/1) for wide compatibility if needed, or Boolean
 
+    # Serves GET /alerts/unread (WHERE is_read = 0 ORDER BY timestamp DESC).
+    # The unique index stops repeated scans from storing the same headline twice.
+    __table_args__ = (
+        Index("IX_SentimentAlerts_is_read_timestamp", "is_read", "timestamp"),
+        Index("UX_SentimentAlerts_stock_symbol_headline", "stock_symbol", "headline", unique=True),
+    )
+
+class SentimentCacheEntry(Base):
+    """
+    FinBERT score per normalized headline, so repeated scans skip inference.
+    """
+    __tablename__ = "SentimentCache"
+
+    headline_hash = Column(String(64), primary_key=True) # sha256 of the normalized headline
+    model_version = Column(String(100), primary_key=True)
+    sentiment_score = Column(DECIMAL(10, 4), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
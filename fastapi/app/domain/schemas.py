@@ -37,6 +37,59 @@ class TransactionRead(TransactionBase):
     class Config:
         from_attributes = True
 
+# Holding Schemas
+class HoldingRead(BaseModel):
+    StockSymbol: str
+    Quantity: int
+
+    class Config:
+        from_attributes = True
+
+# Quote Schemas
+class QuoteRead(BaseModel):
+    Symbol: str
+    Price: float
+    AsOf: datetime
+
+# Valuation Schemas
+class PositionValuation(BaseModel):
+    StockSymbol: str
+    Quantity: int
+    Price: Optional[float] # None when no quote was found
+    MarketValue: Optional[float]
+    AverageCost: float
+    CostBasis: float
+    UnrealizedPnL: Optional[float]
+    Weight: Optional[float] # Share of the priced market value
+
+class PortfolioValuation(BaseModel):
+    UserID: int
+    AsOf: datetime # Time of the oldest quote used
+    TotalMarketValue: float
+    TotalCostBasis: float # Of the priced positions
+    TotalUnrealizedPnL: float
+    Positions: List[PositionValuation] = []
+
+# Cost Basis Schemas
+class PositionCostBasis(BaseModel):
+    StockSymbol: str
+    Quantity: int
+    AverageCost: float
+    CostBasis: float # Of the open long shares
+    RealizedPnL: float
+
+# History Schemas
+class PortfolioHistoryPoint(BaseModel):
+    Date: datetime
+    Value: float # Market value of the holdings at that close
+    Invested: float # Net cash put in (buys - sells) up to that close
+
+class PortfolioHistory(BaseModel):
+    UserID: int
+    Period: str
+    Interval: str
+    Points: List[PortfolioHistoryPoint] = []
+
 class UserWithTransactions(UserRead):
     transactions: List[TransactionRead] = []
 
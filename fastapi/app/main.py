@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from app.config.database import engine, Base
 from app.api import endpoints
 
@@ -11,25 +12,52 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Transaction pages and portfolio curves are large JSON arrays; clients send Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 app.include_router(endpoints.router, prefix="/api/v1")
-from app.routers import alerts
+from app.routers import alerts, metrics
 app.include_router(alerts.router, prefix="/api/v1")
+app.include_router(metrics.router)
 
 # Background Task Integration
 import asyncio
 from app.background.scheduler import BackgroundMonitor
+from app.background.loop_monitor import LoopLagMonitor
 
+# Startup work (Holdings seeding, BackgroundMonitor) runs once per process, so the app is
+# served by a single uvicorn worker (run.py); don't start it with --workers.
 @app.on_event("startup")
 async def startup_event():
     # Ensure tables are created
     # In production, use migrations (Alembic). For dev, this is fine.
+    # Indexes added to existing tables are applied separately with `python migrate.py`.
     # We need to import the model so Base knows about it
-    from app.domain.models import SentimentAlert, Base
+    from app.domain.models import SentimentAlert, Holding, Base
     Base.metadata.create_all(bind=engine)
+
+    # Seed the Holdings read model from the ledger the first time it is created
+    from app.config.database import SessionLocal
+    from app.services.holdings_service import HoldingsService
+    db = SessionLocal()
+    try:
+        if db.query(Holding).first() is None:
+            print(f"Holdings table empty, rebuilt {HoldingsService(db).rebuild()} positions from the ledger.")
+    finally:
+        db.close()
     
+    # Keep references so the tasks are not garbage collected
+    app.state.loop_lag_monitor = LoopLagMonitor()
+    app.state.loop_lag_task = asyncio.create_task(app.state.loop_lag_monitor.run())
+
     monitor = BackgroundMonitor()
-    # Run in background without blocking the server
-    asyncio.create_task(monitor.start_monitoring())
+    # Run in background without blocking the server (blocking stages run on the monitor's worker thread)
+    app.state.monitor_task = asyncio.create_task(monitor.start_monitoring())
+
+@app.on_event("shutdown")
+def shutdown_event():
+    from app.services import password_service
+    password_service.shutdown()
 
 @app.get("/")
 def read_root():
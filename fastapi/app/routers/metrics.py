@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.config.metrics import render_prometheus
+
+router = APIRouter()
+
+@router.get("/metrics", tags=["Metrics"], response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Process metrics in Prometheus text format (connection pool, background monitor, caches).
+    """
+    return render_prometheus()
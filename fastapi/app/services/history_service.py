@@ -0,0 +1,210 @@
+import os
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from app.config.metrics import register_collector
+
+PERIODS = ["1mo", "3mo", "6mo", "1y", "2y", "5y"]
+INTERVALS = {"1d": None, "1wk": "W-FRI"} # interval -> resample rule applied to the daily curve
+
+class YahooHistoryProvider:
+    def get_closes(self, symbols: List[str], period: str) -> pd.DataFrame:
+        import yfinance as yf
+        # One download for every symbol
+        data = yf.download(symbols, period=period, interval="1d", progress=False, auto_adjust=False, group_by="ticker")
+        if data is None or data.empty:
+            return pd.DataFrame(columns=symbols)
+        if isinstance(data.columns, pd.MultiIndex):
+            closes = data.xs("Close", axis=1, level=-1)
+        else:
+            closes = data[["Close"]].set_axis(symbols, axis=1)
+        closes.index = pd.DatetimeIndex(closes.index).tz_localize(None).normalize()
+        return closes
+
+
+class StubHistoryProvider:
+    """
+    Offline daily closes (deterministic random walk per symbol), for tests and benchmarks.
+    """
+    def get_closes(self, symbols: List[str], period: str) -> pd.DataFrame:
+        end = pd.Timestamp(datetime.utcnow().date())
+        days = pd.bdate_range(end - pd.tseries.frequencies.to_offset(_period_offset(period)), end)
+        closes = {}
+        for symbol in symbols:
+            rng = np.random.default_rng(zlib.crc32(f"{symbol}:{end.date()}".encode()))
+            base_price = 50 + zlib.crc32(symbol.encode()) % 450
+            closes[symbol] = base_price * np.exp(np.cumsum(rng.normal(0, 0.01, len(days))))
+        return pd.DataFrame(closes, index=days)
+
+
+def _period_offset(period: str) -> str:
+    return {"1mo": "30D", "3mo": "91D", "6mo": "182D", "1y": "365D", "2y": "730D", "5y": "1826D"}[period]
+
+def _default_provider():
+    # HISTORY_PROVIDER=stub builds equity curves without network access
+    if os.getenv("HISTORY_PROVIDER", "yahoo").lower() == "stub":
+        return StubHistoryProvider()
+    return YahooHistoryProvider()
+
+
+class EquityCurve:
+    """Daily portfolio curve of one user and period, kept so new trades can be applied in place."""
+    def __init__(self, days: np.ndarray, symbols: List[str], closes: np.ndarray, positions: np.ndarray, invested: np.ndarray, expires_at: float):
+        self.days = days # datetime64[D], ascending
+        self.columns = {symbol: j for j, symbol in enumerate(symbols)}
+        self.closes = closes # days x symbols, NaN before a symbol's first close
+        self.positions = positions # days x symbols, shares held at each close
+        self.invested = invested # Net cash put in (buys - sells) up to each close
+        self.expires_at = expires_at
+
+    def values(self) -> np.ndarray:
+        return np.nansum(self.positions * self.closes, axis=1)
+
+
+class HistoryService:
+    """
+    Portfolio value over time from the ledger and daily closes.
+
+    Closes are cached per (symbol, period) and curves per (user, period), both for
+    `ttl` seconds. A new transaction is applied to the user's cached curves in place
+    (only a symbol the curve has no prices for drops it).
+    """
+    def __init__(self, provider=None, ttl: Optional[float] = None):
+        self.provider = provider or _default_provider()
+        self.ttl = ttl if ttl is not None else float(os.getenv("HISTORY_CACHE_TTL_SECONDS", "900"))
+        self.lock = threading.Lock()
+        self.closes: Dict[Tuple[str, str], Tuple[pd.Series, float]] = {}
+        self.curves: Dict[Tuple[int, str], EquityCurve] = {}
+        self.versions: Dict[int, int] = {} # user -> trades seen, so a build that raced a trade isn't cached
+
+        self.curve_hits = 0
+        self.curve_misses = 0
+        self.incremental_updates = 0
+        self.invalidations = 0
+        self.upstream_calls = 0
+
+    def metrics(self):
+        return {
+            "history_curve_cache_hits_total": self.curve_hits,
+            "history_curve_cache_misses_total": self.curve_misses,
+            "history_curve_cache_entries": len(self.curves),
+            "history_curve_incremental_updates_total": self.incremental_updates,
+            "history_curve_invalidations_total": self.invalidations,
+            "history_upstream_calls_total": self.upstream_calls,
+        }
+
+    def get_closes(self, symbols: List[str], period: str) -> pd.DataFrame:
+        """Daily closes (days x symbols, forward filled), fetching uncached symbols in one call."""
+        now = time.monotonic()
+        with self.lock:
+            cached = {s: self.closes[(s, period)][0] for s in symbols if (s, period) in self.closes and self.closes[(s, period)][1] > now}
+        missing = [s for s in symbols if s not in cached]
+
+        if missing:
+            with self.lock:
+                self.upstream_calls += 1
+            try:
+                fetched = self.provider.get_closes(missing, period)
+            except Exception as e:
+                print(f"Error fetching price history for {missing}: {e}")
+                fetched = pd.DataFrame()
+            with self.lock:
+                for symbol in missing:
+                    if symbol in fetched.columns:
+                        series = fetched[symbol].dropna()
+                        cached[symbol] = series
+                        self.closes[(symbol, period)] = (series, now + self.ttl)
+
+        if not cached:
+            return pd.DataFrame(columns=symbols)
+        return pd.DataFrame(cached).sort_index().ffill().reindex(columns=symbols)
+
+    def get_cached(self, user_id: int, period: str) -> Optional[EquityCurve]:
+        with self.lock:
+            curve = self.curves.get((user_id, period))
+            if curve and curve.expires_at > time.monotonic():
+                self.curve_hits += 1
+                return curve
+            self.curve_misses += 1
+            return None
+
+    def version(self, user_id: int) -> int:
+        """Read before loading the ledger and passed to build()."""
+        with self.lock:
+            return self.versions.get(user_id, 0)
+
+    def build(self, user_id: int, period: str, version: int, symbols: Sequence[str], quantities: Sequence[int], prices: Sequence[float], dates: Sequence[datetime]) -> EquityCurve:
+        """
+        Builds and caches the curve from the user's whole ledger (in any order).
+        Positions at each close are as-of joins: every trade on or before that day counts.
+        """
+        symbols = np.asarray(symbols, dtype=object)
+        quantities = np.asarray(quantities, dtype=np.int64)
+        cash = quantities * np.asarray(prices, dtype=np.float64)
+        trade_days = np.asarray(dates, dtype="datetime64[D]")
+        held = sorted(set(symbols.tolist()))
+
+        closes = self.get_closes(held, period)
+        days = closes.index.values.astype("datetime64[D]")
+        close_matrix = closes.to_numpy(dtype=np.float64)
+
+        positions = np.zeros((len(days), len(held)))
+        for j, symbol in enumerate(held):
+            mask = symbols == symbol
+            order = np.argsort(trade_days[mask], kind="stable")
+            symbol_days = trade_days[mask][order]
+            held_after = np.r_[0, np.cumsum(quantities[mask][order])]
+            positions[:, j] = held_after[np.searchsorted(symbol_days, days, side="right")]
+
+        order = np.argsort(trade_days, kind="stable")
+        invested_after = np.r_[0.0, np.cumsum(cash[order])]
+        invested = invested_after[np.searchsorted(trade_days[order], days, side="right")]
+
+        curve = EquityCurve(days, held, close_matrix, positions, invested, time.monotonic() + self.ttl)
+        with self.lock:
+            # A trade that arrived after the ledger was read is missing from this curve
+            if self.versions.get(user_id, 0) == version:
+                self.curves[(user_id, period)] = curve
+        return curve
+
+    def on_transaction(self, user_id: int, symbol: str, quantity: int, price: float, date: datetime):
+        """Applies a new trade to the user's cached curves."""
+        day = np.datetime64(date, "D")
+        with self.lock:
+            self.versions[user_id] = self.versions.get(user_id, 0) + 1
+            for key in [key for key in self.curves if key[0] == user_id]:
+                curve = self.curves[key]
+                if symbol not in curve.columns:
+                    # No closes for this symbol in the curve yet - rebuild on the next request
+                    del self.curves[key]
+                    self.invalidations += 1
+                    continue
+                affected = curve.days >= day
+                curve.positions[affected, curve.columns[symbol]] += quantity
+                curve.invested[affected] += quantity * price
+                self.incremental_updates += 1
+
+    def to_points(self, curve: EquityCurve, interval: str) -> pd.DataFrame:
+        with self.lock: # on_transaction updates cached curves in place
+            points = pd.DataFrame({"Value": curve.values(), "Invested": curve.invested.copy()}, index=pd.DatetimeIndex(curve.days))
+        rule = INTERVALS[interval]
+        if rule:
+            points = points.resample(rule).last().dropna()
+        return points
+
+
+_history_service: Optional[HistoryService] = None
+_history_service_lock = threading.Lock()
+
+def get_history_service() -> HistoryService:
+    """Process-wide HistoryService, so every request shares one cache."""
+    global _history_service
+    with _history_service_lock:
+        if _history_service is None:
+            _history_service = HistoryService()
+            register_collector(_history_service.metrics)
+        return _history_service
@@ -0,0 +1,88 @@
+from decimal import Decimal
+from typing import Optional, Tuple
+from sqlalchemy.orm import Session
+from app.domain import models
+
+def apply_trade(quantity: int, cost_basis: Decimal, trade_qty: int, price: Decimal) -> Tuple[int, Decimal]:
+    """
+    Applies one ledger row to a position using the average-cost method.
+    Returns the new (quantity, cost_basis). Cost basis only tracks long shares,
+    so a flat or short position always has a cost basis of 0.
+    """
+    price = Decimal(price)
+    new_qty = quantity + trade_qty
+
+    if trade_qty > 0: # Buy
+        if quantity >= 0:
+            cost_basis = cost_basis + trade_qty * price
+        else:
+            # Covering a short position: only the shares above 0 carry cost
+            cost_basis = max(new_qty, 0) * price
+    elif trade_qty < 0 and quantity > 0: # Sell out of a long position
+        sold = min(-trade_qty, quantity)
+        cost_basis = cost_basis - cost_basis * sold / quantity
+
+    if new_qty <= 0:
+        cost_basis = Decimal("0")
+
+    return new_qty, cost_basis
+
+
+class HoldingsService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def apply_transaction(self, user_id: int, symbol: str, quantity: int, price: Decimal) -> models.Holding:
+        """
+        Updates the Holdings row for a new transaction.
+        Does not commit - the caller commits it together with the ledger insert.
+        """
+        holding = (
+            self.db.query(models.Holding)
+            .filter(models.Holding.UserID == user_id, models.Holding.StockSymbol == symbol)
+            .with_for_update()
+            .first()
+        )
+        if not holding:
+            holding = models.Holding(UserID=user_id, StockSymbol=symbol, Quantity=0, CostBasis=Decimal("0"))
+            self.db.add(holding)
+
+        holding.Quantity, holding.CostBasis = apply_trade(
+            holding.Quantity or 0, Decimal(holding.CostBasis or 0), quantity, price
+        )
+        return holding
+
+    def rebuild(self, user_id: Optional[int] = None) -> int:
+        """
+        Regenerates the Holdings table (or one user's rows) from the Transactions ledger.
+        Returns the number of holding rows written.
+        """
+        holdings_query = self.db.query(models.Holding)
+        ledger_query = self.db.query(
+            models.Transaction.UserID,
+            models.Transaction.StockSymbol,
+            models.Transaction.Quantity,
+            models.Transaction.PricePerStock,
+        )
+        if user_id is not None:
+            holdings_query = holdings_query.filter(models.Holding.UserID == user_id)
+            ledger_query = ledger_query.filter(models.Transaction.UserID == user_id)
+
+        positions = {}
+        for row in ledger_query.order_by(models.Transaction.TransactionID).yield_per(10000):
+            key = (row.UserID, row.StockSymbol.strip().upper()) # Merges older lower-case ledger rows
+            qty, cost = positions.get(key, (0, Decimal("0")))
+            positions[key] = apply_trade(qty, cost, row.Quantity, row.PricePerStock)
+
+        try:
+            holdings_query.delete(synchronize_session=False)
+            self.db.add_all(
+                models.Holding(UserID=uid, StockSymbol=symbol, Quantity=qty, CostBasis=cost)
+                for (uid, symbol), (qty, cost) in positions.items()
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return len(positions)
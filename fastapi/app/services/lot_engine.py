@@ -0,0 +1,113 @@
+from typing import Dict, Sequence
+import numpy as np
+
+# Cost basis and realized P&L from the Transactions ledger, computed on whole arrays.
+#
+# Trades must be grouped by symbol and in ledger order within each symbol
+# (ORDER BY StockSymbol, TransactionID). Follows the same rules as HoldingsService:
+# only long shares carry cost, so selling more than is held opens a short that has no
+# cost basis and realizes nothing, and a later buy first covers that short.
+
+def _linear_scan(alpha: np.ndarray, beta: np.ndarray) -> np.ndarray:
+    """
+    Solves x[t] = alpha[t] * x[t-1] + beta[t] (x[-1] = 0) for every t with a
+    log-depth prefix scan, so there is no Python loop over the trades.
+    """
+    a = alpha.copy()
+    x = beta.copy()
+    step = 1
+    while step < len(x):
+        x[step:] = a[step:] * x[:-step] + x[step:]
+        a[step:] = a[step:] * a[:-step]
+        step *= 2
+    return x
+
+def _shift(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    # Value of the previous trade of the same symbol (0 for a symbol's first trade)
+    previous = np.empty_like(values)
+    previous[0] = 0
+    previous[1:] = values[:-1]
+    previous[starts] = 0
+    return previous
+
+def replay_trades(symbols: Sequence[str], quantities: Sequence[int], prices: Sequence[float]) -> Dict[str, np.ndarray]:
+    """
+    Replays a ledger with both the average-cost and the FIFO method.
+
+    Per symbol (in input order): "symbols", "quantity", "average_cost", "cost_basis",
+    "realized_pnl" (average cost), "fifo_cost_basis" and "fifo_realized_pnl".
+    Per trade: "trade_position", "trade_average_cost" (after the trade),
+    "trade_realized_pnl" and "trade_fifo_realized_pnl".
+    """
+    symbols = np.asarray(symbols)
+    quantities = np.asarray(quantities, dtype=np.int64)
+    prices = np.asarray(prices, dtype=np.float64)
+    n = len(quantities)
+    if n == 0:
+        empty = np.zeros(0)
+        return {
+            "symbols": symbols[:0], "quantity": quantities[:0], "average_cost": empty, "cost_basis": empty,
+            "realized_pnl": empty, "fifo_cost_basis": empty, "fifo_realized_pnl": empty,
+            "trade_position": quantities[:0], "trade_average_cost": empty,
+            "trade_realized_pnl": empty, "trade_fifo_realized_pnl": empty,
+        }
+
+    is_start = np.empty(n, dtype=bool)
+    is_start[0] = True
+    is_start[1:] = symbols[1:] != symbols[:-1]
+    starts = np.flatnonzero(is_start)
+    ends = np.r_[starts[1:], n] - 1
+    counts = ends - starts + 1
+
+    def per_symbol_cumsum(values):
+        total = np.cumsum(values)
+        before = np.r_[0, total[:-1]][starts]
+        return total - np.repeat(before, counts), np.repeat(before, counts)
+
+    # Net position after each trade, and the long part of it that carries cost
+    position, _ = per_symbol_cumsum(quantities)
+    long = np.maximum(position, 0)
+    previous_long = _shift(long, starts)
+    bought = np.maximum(long - previous_long, 0).astype(np.float64)
+    sold = np.maximum(previous_long - long, 0).astype(np.float64)
+
+    # Average cost: a buy blends into the average, a sell leaves it unchanged.
+    # avg[t] = avg[t-1] * previous_long / long + bought * price / long
+    is_buy = bought > 0
+    safe_long = np.where(is_buy, long, 1)
+    alpha = np.where(is_buy, previous_long / safe_long, 1.0)
+    beta = np.where(is_buy, bought * prices / safe_long, 0.0)
+    alpha[starts] = 0.0 # Symbols don't share an average
+    average_cost = _linear_scan(alpha, beta)
+    realized = sold * (prices - _shift(average_cost, starts))
+
+    # FIFO: the k-th share sold of a symbol is the k-th share bought. Cumulative buy cost
+    # is piecewise linear in cumulative shares bought, so the cost of the first k shares
+    # is an interpolation over the (global) running totals.
+    bought_total = np.r_[0.0, np.cumsum(bought)]
+    cost_total = np.r_[0.0, np.cumsum(bought * prices)]
+    sold_cumulative, _ = per_symbol_cumsum(sold)
+    _, base = per_symbol_cumsum(bought)
+    sold_cost_cumulative = np.interp(base + sold_cumulative, bought_total, cost_total) - np.interp(base, bought_total, cost_total)
+    sold_cost = sold_cost_cumulative - _shift(sold_cost_cumulative, starts)
+    fifo_realized = sold * prices - sold_cost
+
+    # Per symbol summaries
+    quantity = position[ends]
+    long_end = long[ends]
+    bought_cost = np.add.reduceat(bought * prices, starts)
+    average_end = np.where(long_end > 0, average_cost[ends], 0.0)
+
+    return {
+        "symbols": symbols[starts],
+        "quantity": quantity,
+        "average_cost": average_end,
+        "cost_basis": average_end * long_end,
+        "realized_pnl": np.add.reduceat(realized, starts),
+        "fifo_cost_basis": np.where(long_end > 0, bought_cost - sold_cost_cumulative[ends], 0.0),
+        "fifo_realized_pnl": np.add.reduceat(fifo_realized, starts),
+        "trade_position": position,
+        "trade_average_cost": average_cost,
+        "trade_realized_pnl": realized,
+        "trade_fifo_realized_pnl": fifo_realized,
+    }
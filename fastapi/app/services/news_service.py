@@ -1,30 +1,148 @@
-import yfinance as yf
-from typing import List, Dict
+import heapq
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Optional
+
+class YahooNewsProvider:
+    def get_news(self, ticker: str) -> List[dict]:
+        import yfinance as yf
+        # yfinance returns a list of dictionaries with 'title', 'link', etc.
+        return yf.Ticker(ticker).news or []
+
+
+class StubNewsProvider:
+    """
+    Offline news source with canned headlines, for tests and benchmarks.
+    Can simulate network latency and a failure rate.
+    """
+    TEMPLATES = [
+        "{ticker} shares rally after earnings beat expectations",
+        "{ticker} faces regulatory probe over accounting practices",
+        "Analysts stay neutral on {ticker} ahead of product launch",
+        "{ticker} announces share buyback program",
+        "{ticker} cuts full-year guidance amid weak demand",
+    ]
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+
+    def get_news(self, ticker: str) -> List[dict]:
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and self.rng.random() < self.failure_rate:
+            raise ConnectionError(f"Simulated failure for {ticker}")
+        start = sum(map(ord, ticker)) % len(self.TEMPLATES)
+        return [{"title": self.TEMPLATES[(start + i) % len(self.TEMPLATES)].format(ticker=ticker)} for i in range(3)]
+
+
+def _default_provider():
+    # NEWS_PROVIDER=stub runs the monitor without network access
+    if os.getenv("NEWS_PROVIDER", "yahoo").lower() == "stub":
+        return StubNewsProvider()
+    return YahooNewsProvider()
+
 
 class NewsService:
+    def __init__(
+        self,
+        provider=None,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        backoff: float = 0.5,
+    ):
+        self.provider = provider or _default_provider()
+        self.max_workers = max_workers or int(os.getenv("NEWS_MAX_WORKERS", "16"))
+        self.timeout = timeout or float(os.getenv("NEWS_FETCH_TIMEOUT", "10")) # Seconds per attempt
+        self.retries = retries if retries is not None else int(os.getenv("NEWS_FETCH_RETRIES", "2"))
+        self.backoff = backoff
+
+    def _fetch_headlines(self, ticker: str) -> List[str]:
+        raw_news = self.provider.get_news(ticker)
+        # Get top 3 headlines to save processing time
+        return [item.get('title', '') for item in raw_news[:3] if item.get('title')]
+
     def fetch_news(self, tickers: List[str]) -> Dict[str, List[str]]:
         """
         Fetches the latest news headlines for the given tickers.
         Returns a dictionary: { "AAPL": ["Headline 1", "Headline 2"], ... }
+
+        Tickers are fetched concurrently (at most max_workers at a time). Each attempt
+        gets `timeout` seconds from the moment a worker picks it up, and failed attempts
+        are retried with jittered exponential backoff. An attempt that times out is not
+        retried, since its thread may still be blocked on the request. Tickers that
+        still fail are left out, so the result may be partial.
         """
+        tickers = list(dict.fromkeys(tickers))
         news_data = {}
-        
-        for ticker in tickers:
-            try:
-                stock = yf.Ticker(ticker)
-                # yfinance returns a list of dictionaries with 'title', 'link', etc.
-                raw_news = stock.news
-                
-                headlines = []
-                if raw_news:
-                    # Get top 3 headlines to save processing time
-                    for item in raw_news[:3]:
-                        headlines.append(item.get('title', ''))
-                
-                if headlines:
-                    news_data[ticker] = headlines
-                    
-            except Exception as e:
-                print(f"Error fetching news for {ticker}: {e}")
-                
-        return news_data
+        if not tickers:
+            return news_data
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(tickers)), thread_name_prefix="news")
+        running = {} # future -> (ticker, attempt)
+        started = {} # (ticker, attempt) -> monotonic time a worker picked it up
+        retry_queue = [] # heap of (ready_at, ticker, attempt)
+
+        def attempt_fetch(ticker: str, attempt: int) -> List[str]:
+            started[(ticker, attempt)] = time.monotonic()
+            return self._fetch_headlines(ticker)
+
+        def submit(ticker: str, attempt: int):
+            running[executor.submit(attempt_fetch, ticker, attempt)] = (ticker, attempt)
+
+        def deadline(ticker: str, attempt: int, now: float) -> float:
+            # Still queued behind other tickers: the clock has not started yet
+            return started.get((ticker, attempt), now) + self.timeout
+
+        def failed(ticker: str, attempt: int, error):
+            if attempt < self.retries:
+                delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+                heapq.heappush(retry_queue, (time.monotonic() + delay, ticker, attempt + 1))
+            else:
+                print(f"Error fetching news for {ticker}: {error}")
+
+        try:
+            for ticker in tickers:
+                submit(ticker, 0)
+
+            while running or retry_queue:
+                now = time.monotonic()
+                while retry_queue and retry_queue[0][0] <= now:
+                    _, ticker, attempt = heapq.heappop(retry_queue)
+                    submit(ticker, attempt)
+
+                if not running:
+                    time.sleep(max(retry_queue[0][0] - now, 0))
+                    continue
+
+                wake_at = min(deadline(ticker, attempt, now) for ticker, attempt in running.values())
+                if retry_queue:
+                    wake_at = min(wake_at, retry_queue[0][0])
+                done, _ = wait(running, timeout=max(wake_at - now, 0), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    ticker, attempt = running.pop(future)
+                    try:
+                        headlines = future.result()
+                    except Exception as e:
+                        failed(ticker, attempt, e)
+                        continue
+                    if headlines:
+                        news_data[ticker] = headlines
+
+                # A hung request keeps its worker thread, but we stop waiting for it.
+                # Retrying would stack another blocked thread on the same endpoint.
+                now = time.monotonic()
+                for future, (ticker, attempt) in list(running.items()):
+                    if deadline(ticker, attempt, now) <= now:
+                        running.pop(future)
+                        print(f"Error fetching news for {ticker}: timed out after {self.timeout}s")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        # Keep the caller's ticker order
+        return {ticker: news_data[ticker] for ticker in tickers if ticker in news_data}
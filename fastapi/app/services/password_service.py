@@ -0,0 +1,99 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else None
+
+# argon2 cost parameters (unset = passlib defaults). Changing them only affects new hashes;
+# existing hashes keep verifying with the parameters stored inside them.
+ARGON2_TIME_COST = _env_int("ARGON2_TIME_COST")
+ARGON2_MEMORY_COST = _env_int("ARGON2_MEMORY_COST") # KiB
+ARGON2_PARALLELISM = _env_int("ARGON2_PARALLELISM")
+
+# Hashing is CPU and memory heavy, so it runs in a small process pool instead of on request threads
+PASSWORD_HASH_WORKERS = _env_int("PASSWORD_HASH_WORKERS") or min(4, os.cpu_count() or 1)
+# Hash/verify jobs allowed in flight (running or queued for the pool) before new ones are
+# rejected with 503. Callers await the jobs on the event loop rather than blocking a threadpool
+# worker, so this cap, not the threadpool size (40), is what bounds a login storm; jobs beyond
+# PASSWORD_HASH_WORKERS queue up, each adding roughly one hash time of latency per worker.
+PASSWORD_HASH_MAX_PENDING = _env_int("PASSWORD_HASH_MAX_PENDING") or 64
+
+_argon2_settings = {
+    f"argon2__{name}": value
+    for name, value in (
+        ("time_cost", ARGON2_TIME_COST),
+        ("memory_cost", ARGON2_MEMORY_COST),
+        ("parallelism", ARGON2_PARALLELISM),
+    )
+    if value is not None
+}
+
+# Switching to argon2 to avoid 72 byte limit of bcrypt and for better security.
+# Built once per process (the API process and every pool worker).
+pwd_context = CryptContext(schemes=["argon2"], deprecated="auto", **_argon2_settings)
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(password, hashed_password)
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+        return _executor
+
+def _submit(fn, *args) -> Future:
+    if not _pending.acquire(blocking=False):
+        raise HTTPException(status_code=503, detail="Server busy, please retry")
+    try:
+        future = _get_executor().submit(fn, *args)
+    except Exception:
+        _pending.release()
+        raise
+    future.add_done_callback(lambda _: _pending.release())
+    return future
+
+# The functions below raise HTTPException: 503 when the pool is full, 500 when hashing fails
+
+def _hash_failed(e: Exception) -> HTTPException:
+    print(f"Hashing Error: {e}")
+    return HTTPException(status_code=500, detail=f"Hashing failed: {str(e)}")
+
+def _verify_failed(e: Exception) -> HTTPException:
+    print(f"Login Verify Error: {e}")
+    return HTTPException(status_code=500, detail="Authentication failed")
+
+async def hash_password_async(password: str) -> str:
+    future = _submit(_hash, password)
+    try:
+        return await asyncio.wrap_future(future)
+    except Exception as e:
+        raise _hash_failed(e)
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    future = _submit(_verify, password, hashed_password)
+    try:
+        return await asyncio.wrap_future(future)
+    except Exception as e:
+        raise _verify_failed(e)
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,222 @@
+import asyncio
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.config.metrics import register_collector
+
+class YahooQuoteProvider:
+    def get_prices(self, symbols: List[str]) -> Dict[str, float]:
+        import yfinance as yf
+        # One download for every symbol of the batch instead of one Ticker() call each
+        data = yf.download(symbols, period="5d", interval="1d", progress=False, auto_adjust=False, group_by="ticker")
+        prices = {}
+        if data is None or data.empty:
+            return prices
+        for symbol in symbols:
+            try:
+                close = data[symbol]["Close"] if len(symbols) > 1 else data["Close"]
+                if hasattr(close, "columns"): # Single-ticker downloads can still be (field, ticker) columns
+                    close = close.iloc[:, 0]
+                close = close.dropna()
+            except KeyError:
+                continue
+            if not close.empty:
+                prices[symbol] = float(close.iloc[-1])
+        return prices
+
+
+class StubQuoteProvider:
+    """
+    Offline quote source with deterministic prices, for tests and benchmarks.
+    Can simulate upstream latency. Symbols starting with "X" are treated as unknown.
+    """
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def get_prices(self, symbols: List[str]) -> Dict[str, float]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return {symbol: float(50 + zlib.crc32(symbol.encode()) % 450) for symbol in symbols if not symbol.startswith("X")}
+
+
+def _default_provider():
+    # QUOTE_PROVIDER=stub serves quotes without network access
+    if os.getenv("QUOTE_PROVIDER", "yahoo").lower() == "stub":
+        return StubQuoteProvider()
+    return YahooQuoteProvider()
+
+
+class QuoteService:
+    """
+    Last-price cache shared by every request of the worker process.
+
+    Quotes are cached per symbol for `ttl` seconds. Symbols that are missing or expired
+    are fetched in one upstream call, and a request for a symbol that is already being
+    fetched waits for that fetch instead of starting another one (single-flight), so N
+    concurrent requests for NVDA cause exactly one upstream call. If an upstream call
+    fails, an expired quote is served rather than nothing.
+    """
+    def __init__(self, provider=None, ttl: Optional[float] = None, max_workers: Optional[int] = None):
+        self.provider = provider or _default_provider()
+        self.ttl = ttl if ttl is not None else float(os.getenv("QUOTE_TTL_SECONDS", "15"))
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or int(os.getenv("QUOTE_FETCH_WORKERS", "4")),
+            thread_name_prefix="quotes"
+        )
+        self.lock = threading.Lock()
+        self.cache: Dict[str, Tuple[float, datetime, float]] = {} # symbol -> (price, as_of, expires_at)
+        self.in_flight: Dict[str, Future] = {} # symbol -> Future resolving to {symbol: (price, as_of)}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.upstream_calls = 0
+        self.upstream_symbols = 0
+        self.upstream_errors = 0
+
+    def metrics(self):
+        lookups = self.hits + self.misses
+        return {
+            "quote_cache_hits_total": self.hits,
+            "quote_cache_misses_total": self.misses,
+            "quote_cache_hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "quote_cache_entries": len(self.cache),
+            "quote_requests_coalesced_total": self.coalesced,
+            "quote_upstream_calls_total": self.upstream_calls,
+            "quote_upstream_symbols_total": self.upstream_symbols,
+            "quote_upstream_errors_total": self.upstream_errors,
+        }
+
+    def _fetch(self, symbols: List[str]) -> Dict[str, Tuple[float, datetime]]:
+        with self.lock:
+            self.upstream_calls += 1
+            self.upstream_symbols += len(symbols)
+        try:
+            prices = self.provider.get_prices(symbols)
+        except Exception:
+            with self.lock:
+                self.upstream_errors += 1
+            raise
+        as_of = datetime.utcnow()
+        return {symbol: (price, as_of) for symbol, price in prices.items()}
+
+    def _store(self, symbols: List[str], future: Future):
+        # Done callback of the upstream call; waiters read the future's result directly
+        with self.lock:
+            for symbol in symbols:
+                if self.in_flight.get(symbol) is future:
+                    del self.in_flight[symbol]
+            if future.cancelled() or future.exception() is not None:
+                return
+            expires_at = time.monotonic() + self.ttl
+            for symbol, (price, as_of) in future.result().items():
+                self.cache[symbol] = (price, as_of, expires_at)
+
+    def _lookup(self, symbols: Iterable[str]):
+        """
+        Splits symbols into cached quotes and futures to wait on, starting one upstream
+        call for the symbols nobody is fetching yet.
+        """
+        found: Dict[str, Tuple[float, datetime]] = {}
+        waiting: Dict[str, Future] = {}
+        now = time.monotonic()
+
+        with self.lock:
+            to_fetch = []
+            for symbol in symbols:
+                cached = self.cache.get(symbol)
+                if cached and cached[2] > now:
+                    found[symbol] = (cached[0], cached[1])
+                    self.hits += 1
+                elif symbol in self.in_flight:
+                    waiting[symbol] = self.in_flight[symbol]
+                    self.misses += 1
+                    self.coalesced += 1
+                else:
+                    to_fetch.append(symbol)
+                    self.misses += 1
+
+            if to_fetch:
+                future = self.executor.submit(self._fetch, to_fetch)
+                for symbol in to_fetch:
+                    self.in_flight[symbol] = future
+                    waiting[symbol] = future
+                future.add_done_callback(lambda f, batch=to_fetch: self._store(batch, f))
+
+        return found, waiting
+
+    def _collect(self, symbols: List[str], found, waiting, results: Dict[Future, object]):
+        for symbol, future in waiting.items():
+            result = results[future]
+            if isinstance(result, Exception):
+                stale = self.cache.get(symbol)
+                if stale:
+                    found[symbol] = (stale[0], stale[1])
+                continue
+            if symbol in result:
+                found[symbol] = result[symbol]
+        # Keep the caller's symbol order
+        return {symbol: found[symbol] for symbol in symbols if symbol in found}
+
+    def get_quotes(self, symbols: Iterable[str]) -> Dict[str, Tuple[float, datetime]]:
+        """
+        Returns {symbol: (price, as_of)} for the symbols a price was found for.
+        Blocking version, for sync handlers and scripts.
+        """
+        symbols = normalize_symbols(symbols)
+        found, waiting = self._lookup(symbols)
+        results = {}
+        for future in set(waiting.values()):
+            try:
+                results[future] = future.result()
+            except Exception as e:
+                print(f"Error fetching quotes: {e}")
+                results[future] = e
+        return self._collect(symbols, found, waiting, results)
+
+    async def get_quotes_async(self, symbols: Iterable[str]) -> Dict[str, Tuple[float, datetime]]:
+        """Same as get_quotes, but awaits the upstream call instead of blocking a thread."""
+        symbols = normalize_symbols(symbols)
+        found, waiting = self._lookup(symbols)
+        futures = list(set(waiting.values()))
+        outcomes = await asyncio.gather(*(asyncio.wrap_future(f) for f in futures), return_exceptions=True)
+        results = {}
+        for future, outcome in zip(futures, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"Error fetching quotes: {outcome}")
+            results[future] = outcome
+        return self._collect(symbols, found, waiting, results)
+
+    def get_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        return {symbol: price for symbol, (price, _) in self.get_quotes(symbols).items()}
+
+    def invalidate(self, symbol: Optional[str] = None):
+        with self.lock:
+            if symbol is None:
+                self.cache.clear()
+            else:
+                self.cache.pop(symbol.upper(), None)
+
+
+def normalize_symbols(symbols: Iterable[str]) -> List[str]:
+    # "aapl, MSFT,,AAPL" -> ["AAPL", "MSFT"], keeping the caller's order
+    return list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+
+
+_quote_service: Optional[QuoteService] = None
+_quote_service_lock = threading.Lock()
+
+def get_quote_service() -> QuoteService:
+    """Process-wide QuoteService, so every request shares one cache."""
+    global _quote_service
+    with _quote_service_lock:
+        if _quote_service is None:
+            _quote_service = QuoteService()
+            register_collector(_quote_service.metrics)
+        return _quote_service
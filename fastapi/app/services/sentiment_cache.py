@@ -0,0 +1,127 @@
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable
+from sqlalchemy.exc import IntegrityError
+from app.config.database import SessionLocal
+from app.domain.models import SentimentCacheEntry
+
+def normalize_headline(text: str) -> str:
+    # Case, unicode form and whitespace differences should not cause a re-score
+    return " ".join(unicodedata.normalize("NFKC", text).lower().split())
+
+def headline_hash(text: str) -> str:
+    return hashlib.sha256(normalize_headline(text).encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    """
+    Two-level cache of sentiment scores: an in-memory LRU in front of the
+    SentimentCache table, keyed by (headline hash, model version).
+    """
+    def __init__(self, model_version: str, max_memory_entries: int = 10000):
+        self.model_version = model_version
+        self.max_memory_entries = max_memory_entries
+        self.memory: "OrderedDict[str, float]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, score: float):
+        self.memory[key] = score
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, float]:
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, float] = {}
+
+        with self.lock:
+            for key in keys:
+                if key in self.memory:
+                    self.memory.move_to_end(key)
+                    found[key] = self.memory[key]
+
+        missing = [key for key in keys if key not in found]
+        if missing:
+            db = SessionLocal()
+            rows = []
+            try:
+                # Chunked to stay under the SQL Server limit of 2100 parameters
+                for start in range(0, len(missing), 1000):
+                    rows += (
+                        db.query(SentimentCacheEntry.headline_hash, SentimentCacheEntry.sentiment_score)
+                        .filter(SentimentCacheEntry.model_version == self.model_version)
+                        .filter(SentimentCacheEntry.headline_hash.in_(missing[start:start + 1000]))
+                        .all()
+                    )
+            except Exception as e:
+                print(f"Error reading sentiment cache: {e}")
+                rows = []
+            finally:
+                db.close()
+
+            with self.lock:
+                for row in rows:
+                    found[row.headline_hash] = float(row.sentiment_score)
+                    self._remember(row.headline_hash, float(row.sentiment_score))
+
+        with self.lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, scores: Dict[str, float]):
+        if not scores:
+            return
+
+        with self.lock:
+            for key, score in scores.items():
+                self._remember(key, score)
+
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            keys = list(scores)
+            for start in range(0, len(keys), 1000):
+                self._store_chunk(db, keys[start:start + 1000], scores, now)
+        finally:
+            db.close()
+
+    def _store_chunk(self, db, keys, scores: Dict[str, float], now: datetime):
+        def entry(key):
+            return SentimentCacheEntry(headline_hash=key, model_version=self.model_version,
+                                       sentiment_score=scores[key], created_at=now)
+
+        try:
+            existing = {
+                row.headline_hash for row in
+                db.query(SentimentCacheEntry.headline_hash)
+                .filter(SentimentCacheEntry.model_version == self.model_version)
+                .filter(SentimentCacheEntry.headline_hash.in_(keys))
+            }
+            new_keys = [key for key in keys if key not in existing]
+            if not new_keys:
+                return
+            db.add_all(entry(key) for key in new_keys)
+            db.commit()
+        except IntegrityError:
+            # Another process stored some of these between the select and the insert;
+            # fall back to one row at a time so its duplicates don't cost us the rest
+            db.rollback()
+            for key in new_keys:
+                try:
+                    db.add(entry(key))
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()
+                except Exception as e:
+                    db.rollback()
+                    print(f"Error writing sentiment cache: {e}")
+                    return
+        except Exception as e:
+            db.rollback()
+            print(f"Error writing sentiment cache: {e}")
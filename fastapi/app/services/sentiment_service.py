@@ -1,5 +1,8 @@
 from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
+from typing import List, Optional
 import torch
+from app.config.metrics import register_collector
+from app.services.sentiment_cache import SentimentCache, headline_hash
 
 class SentimentService:
     _instance = None
@@ -13,10 +16,17 @@ class SentimentService:
     def initialize_model(self):
         print("Loading FinBERT model... This may take a while using CPU.")
         self.model_name = "ProsusAI/finbert"
+        self.cache = None
+        self.model_batches = 0
+        register_collector(self.metrics)
         try:
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
             self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+            self.model.eval()
             self.analyzer = pipeline("sentiment-analysis", model=self.model, tokenizer=self.tokenizer)
+            # Cached scores are only reused for the exact same model weights
+            revision = getattr(self.model.config, "_commit_hash", None) or "local"
+            self.cache = SentimentCache(f"{self.model_name}@{revision}")
             print("FinBERT model loaded successfully.")
         except Exception as e:
             print(f"Failed to load FinBERT: {e}")
@@ -47,3 +57,76 @@ class SentimentService:
         except Exception as e:
             print(f"Error analyzing text: {e}")
             return 0.0
+
+    def analyze_batch(self, texts: List[str], batch_size: int = 32, use_cache: bool = True) -> List[float]:
+        """
+        Scores many texts with batched model calls. Returns one score per text,
+        in input order, on the same -1..1 scale as analyze().
+        Headlines already in the sentiment cache are not sent to the model.
+        """
+        if not texts:
+            return []
+        if not self.analyzer:
+            return [0.0] * len(texts)
+
+        if not use_cache:
+            return [score or 0.0 for score in self._infer_batch(texts, batch_size)]
+
+        keys = [headline_hash(text) for text in texts]
+        cached = self.cache.get_many(keys)
+
+        # Score each uncached headline once, even if it appears several times
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in pending:
+                pending[key] = text
+
+        if pending:
+            inferred = self._infer_batch(list(pending.values()), batch_size)
+            new_scores = {key: score for key, score in zip(pending.keys(), inferred) if score is not None}
+            self.cache.put_many(new_scores)
+            cached.update(new_scores)
+
+        return [cached.get(key, 0.0) for key in keys]
+
+    def _infer_batch(self, texts: List[str], batch_size: int) -> List[Optional[float]]:
+        # None marks texts whose batch failed, so they are not cached
+        scores: List[Optional[float]] = [None] * len(texts)
+        # Batch texts of similar length together to keep padding small
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        labels = [self.model.config.id2label[i].lower() for i in range(self.model.config.num_labels)]
+
+        for start in range(0, len(order), batch_size):
+            batch_idx = order[start:start + batch_size]
+            try:
+                inputs = self.tokenizer(
+                    [texts[i] for i in batch_idx],
+                    padding=True,
+                    truncation=True,
+                    max_length=512,
+                    return_tensors="pt",
+                )
+                with torch.inference_mode():
+                    probs = torch.softmax(self.model(**inputs).logits, dim=-1)
+                self.model_batches += 1
+                best_scores, best_labels = probs.max(dim=-1)
+
+                for i, raw_score, label_id in zip(batch_idx, best_scores.tolist(), best_labels.tolist()):
+                    label = labels[label_id]
+                    if label == 'positive':
+                        scores[i] = raw_score
+                    elif label == 'negative':
+                        scores[i] = -raw_score
+                    else: # neutral
+                        scores[i] = 0.0
+            except Exception as e:
+                print(f"Error analyzing batch: {e}")
+
+        return scores
+
+    def metrics(self):
+        return {
+            "sentiment_model_batches_total": self.model_batches,
+            "sentiment_cache_hits_total": self.cache.hits if self.cache else 0,
+            "sentiment_cache_misses_total": self.cache.misses if self.cache else 0,
+        }
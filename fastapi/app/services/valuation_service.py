@@ -0,0 +1,34 @@
+from typing import Dict, Sequence
+import numpy as np
+
+def value_positions(quantities: Sequence[float], cost_basis: Sequence[float], prices: Sequence[float]) -> Dict[str, np.ndarray]:
+    """
+    Values a portfolio in one pass over aligned arrays (one entry per position).
+    `prices` holds NaN where no quote was found; those positions get NaN for every
+    price-dependent field and are left out of the totals and weights.
+    """
+    quantities = np.asarray(quantities, dtype=np.float64)
+    cost_basis = np.asarray(cost_basis, dtype=np.float64)
+    prices = np.asarray(prices, dtype=np.float64)
+
+    market_value = quantities * prices
+    with np.errstate(divide="ignore", invalid="ignore"):
+        average_cost = np.where(quantities > 0, cost_basis / quantities, 0.0)
+    unrealized_pnl = market_value - cost_basis
+
+    total_market_value = np.nansum(market_value)
+    if total_market_value > 0:
+        weight = market_value / total_market_value
+    else:
+        weight = np.where(np.isnan(market_value), np.nan, 0.0)
+
+    return {
+        "cost_basis": cost_basis,
+        "market_value": market_value,
+        "average_cost": average_cost,
+        "unrealized_pnl": unrealized_pnl,
+        "weight": weight,
+        "total_market_value": total_market_value,
+        "total_cost_basis": np.sum(cost_basis[~np.isnan(prices)]),
+        "total_unrealized_pnl": np.nansum(unrealized_pnl),
+    }
@@ -0,0 +1,126 @@
+import sys
+import os
+import time
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from sqlalchemy import create_engine, text
+from app.config.database import Base
+from app.config.migrations import run_migrations
+from app.domain import models
+
+# Usage: python benchmark_indexes.py [database_url]
+# Defaults to a throwaway SQLite file. Pass an MSSQL URL to run against a scratch database
+# (the tables are dropped and recreated there, so never point this at real data).
+NUM_USERS = 1000
+NUM_TRANSACTIONS = 1_000_000
+NUM_ALERTS = 200_000
+UNREAD_RATIO = 0.02
+ITERATIONS = 200
+CHUNK_SIZE = 50_000
+
+STOCKS = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "TSMC", "ARM", "SSNLF", "NVDA", "ASML", "META"]
+
+# Composite indexes added for the hot queries (see models.py)
+HOT_INDEXES = [
+    index
+    for table in (models.Transaction.__table__, models.SentimentAlert.__table__)
+    for index in table.indexes
+    if index.name.startswith("IX_")
+]
+
+QUERIES = {
+    "user transactions page": text(
+        "SELECT TransactionID, StockSymbol, Quantity, PricePerStock FROM Transactions "
+        "WHERE UserID = :user_id ORDER BY TransactionID DESC LIMIT 100"
+    ),
+    "user holdings group by": text(
+        "SELECT StockSymbol, SUM(Quantity) FROM Transactions "
+        "WHERE UserID = :user_id GROUP BY StockSymbol HAVING SUM(Quantity) > 0"
+    ),
+    "unread alerts": text(
+        "SELECT id, stock_symbol, headline FROM SentimentAlerts "
+        "WHERE is_read = 0 ORDER BY timestamp DESC"
+    ),
+}
+
+def seed(engine):
+    print(f"Seeding {NUM_USERS} users, {NUM_TRANSACTIONS:,} transactions and {NUM_ALERTS:,} alerts...")
+    rng = random.Random(42)
+    start_date = datetime(2024, 1, 1)
+
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [
+            {"UserID": uid, "Username": f"bench_{uid}", "Email": f"bench_{uid}@example.com",
+             "HashedPassword": "x", "Balance": 0}
+            for uid in range(1, NUM_USERS + 1)
+        ])
+
+        for offset in range(0, NUM_TRANSACTIONS, CHUNK_SIZE):
+            conn.execute(models.Transaction.__table__.insert(), [
+                {"UserID": rng.randint(1, NUM_USERS), "StockSymbol": rng.choice(STOCKS),
+                 "Quantity": rng.choice([1, 1, 1, -1]) * rng.randint(1, 20),
+                 "PricePerStock": round(rng.uniform(100.0, 500.0), 2),
+                 "TransactionDate": start_date + timedelta(minutes=offset + i)}
+                for i in range(min(CHUNK_SIZE, NUM_TRANSACTIONS - offset))
+            ])
+
+        for offset in range(0, NUM_ALERTS, CHUNK_SIZE):
+            conn.execute(models.SentimentAlert.__table__.insert(), [
+                {"stock_symbol": rng.choice(STOCKS), "sentiment_score": -0.9, "headline": f"Headline {offset + i}",
+                 "timestamp": start_date + timedelta(minutes=offset + i),
+                 "is_read": 0 if rng.random() < UNREAD_RATIO else 1}
+                for i in range(min(CHUNK_SIZE, NUM_ALERTS - offset))
+            ])
+
+def measure(engine, label):
+    rng = random.Random(7)
+    print(f"\n--- {label} ---")
+    with engine.connect() as conn:
+        for name, query in QUERIES.items():
+            if engine.dialect.name == "mssql" and " LIMIT 100" in str(query):
+                # T-SQL has no LIMIT
+                query = text(str(query).replace("SELECT ", "SELECT TOP 100 ", 1).replace(" LIMIT 100", ""))
+
+            timings = []
+            for _ in range(ITERATIONS):
+                start = time.perf_counter()
+                conn.execute(query, {"user_id": rng.randint(1, NUM_USERS)}).fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+
+            timings.sort()
+            p50 = timings[len(timings) // 2]
+            p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+            print(f"  {name:<24} p50 = {p50:8.3f} ms   p99 = {p99:8.3f} ms")
+
+def run_benchmark(url):
+    engine = create_engine(url)
+    print(f"Benchmarking against {engine.url.render_as_string(hide_password=True)}")
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    # Start from the pre-migration schema: drop the hot-query indexes declared on the models
+    for index in HOT_INDEXES:
+        index.drop(engine)
+
+    seed(engine)
+    measure(engine, "Before migration (no hot-query indexes)")
+
+    start = time.perf_counter()
+    created = run_migrations(engine)
+    print(f"\nMigration created {len(created)} indexes in {time.perf_counter() - start:.1f} s")
+
+    measure(engine, "After migration")
+    engine.dispose()
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        run_benchmark(sys.argv[1])
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run_benchmark(f"sqlite:///{os.path.join(tmp, 'benchmark.db')}")
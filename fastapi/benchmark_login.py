@@ -0,0 +1,76 @@
+import sys
+import time
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_URL = "http://localhost:8000/api/v1"
+
+# Measures logins/sec under concurrency against a running server, while a probe thread
+# keeps calling a cheap endpoint to show whether the login storm starves other requests.
+# Usage: python benchmark_login.py [concurrency] [total_logins]
+USERNAME = "benchloginuser"
+PASSWORD = "securepassword123"
+EMAIL = "benchlogin@example.com"
+
+def ensure_user():
+    r = requests.post(f"{BASE_URL}/users", json={"Username": USERNAME, "Email": EMAIL, "Password": PASSWORD})
+    if r.status_code not in (201, 400):
+        print(f"Failed to create user: {r.status_code} {r.text}")
+        sys.exit(1)
+    r = requests.post(f"{BASE_URL}/login", json={"Username": USERNAME, "Password": PASSWORD})
+    r.raise_for_status()
+    return r.json()["UserID"]
+
+def probe(user_id, stop, latencies):
+    session = requests.Session()
+    while not stop.is_set():
+        start = time.perf_counter()
+        session.get(f"{BASE_URL}/users/{user_id}")
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.05)
+
+def run_benchmark(concurrency, total):
+    try:
+        user_id = ensure_user()
+    except requests.exceptions.ConnectionError:
+        print("Error: Could not connect to server. Is it running on port 8000?")
+        return
+
+    local = threading.local()
+    status_counts = {}
+    counts_lock = threading.Lock()
+
+    def login(_):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        r = local.session.post(f"{BASE_URL}/login", json={"Username": USERNAME, "Password": PASSWORD})
+        with counts_lock:
+            status_counts[r.status_code] = status_counts.get(r.status_code, 0) + 1
+
+    stop = threading.Event()
+    probe_latencies = []
+    probe_thread = threading.Thread(target=probe, args=(user_id, stop, probe_latencies), daemon=True)
+    probe_thread.start()
+
+    print(f"Running {total} logins with {concurrency} concurrent clients...")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(login, range(total)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    probe_thread.join()
+
+    print(f"\n{total} logins in {elapsed:.2f} s -> {total / elapsed:.1f} logins/s")
+    print(f"Status codes: {status_counts}")
+    if probe_latencies:
+        probe_latencies.sort()
+        p50 = probe_latencies[len(probe_latencies) // 2]
+        p99 = probe_latencies[min(len(probe_latencies) - 1, int(len(probe_latencies) * 0.99))]
+        print(f"GET /users/{{id}} during the storm: p50 = {p50:.1f} ms, p99 = {p99:.1f} ms ({len(probe_latencies)} probes)")
+
+if __name__ == "__main__":
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    run_benchmark(concurrency, total)
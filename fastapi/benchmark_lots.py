@@ -0,0 +1,101 @@
+import sys
+import os
+import time
+from collections import deque
+from decimal import Decimal
+
+import numpy as np
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from app.services.holdings_service import apply_trade
+from app.services.lot_engine import replay_trades
+
+# Usage: python benchmark_lots.py [num_trades]
+# Checks the vectorized lot engine against a row-by-row reference on a small ledger,
+# then times a replay of num_trades (default 1,000,000) synthetic trades.
+NUM_SYMBOLS = 500
+TARGET_SECONDS = 1.0
+
+def make_ledger(num_trades, seed=42):
+    rng = np.random.default_rng(seed)
+    symbols = np.sort(rng.integers(0, NUM_SYMBOLS, num_trades))
+    # Mostly buys, some sells (occasionally more than held, which opens a short)
+    quantities = rng.integers(1, 100, num_trades) * np.where(rng.random(num_trades) < 0.35, -1, 1)
+    prices = np.round(rng.uniform(10, 500, num_trades), 2)
+    return np.char.add("S", symbols.astype(str)), quantities, prices
+
+def reference(symbols, quantities, prices):
+    """Row-by-row replay: apply_trade for average cost, a lot queue for FIFO."""
+    results = {}
+    for symbol, qty, price in zip(symbols, quantities.tolist(), prices.tolist()):
+        state = results.setdefault(symbol, {"qty": 0, "cost": Decimal("0"), "realized": 0.0, "lots": deque(), "fifo_realized": 0.0})
+        long_before = max(state["qty"], 0)
+        if qty < 0 and long_before > 0:
+            sold = min(-qty, long_before)
+            state["realized"] += sold * (price - float(state["cost"]) / long_before)
+            remaining = sold
+            while remaining:
+                lot = state["lots"][0]
+                take = min(lot[0], remaining)
+                state["fifo_realized"] += take * (price - lot[1])
+                lot[0] -= take
+                remaining -= take
+                if lot[0] == 0:
+                    state["lots"].popleft()
+        state["qty"], state["cost"] = apply_trade(state["qty"], state["cost"], qty, Decimal(str(price)))
+        added = max(state["qty"], 0) - long_before
+        if added > 0:
+            state["lots"].append([added, price])
+    return results
+
+def check(num_trades=20_000):
+    symbols, quantities, prices = make_ledger(num_trades, seed=7)
+    result = replay_trades(symbols, quantities, prices)
+    expected = reference(symbols, quantities, prices)
+
+    worst = 0.0
+    for i, symbol in enumerate(result["symbols"]):
+        state = expected[symbol]
+        fifo_basis = sum(q * p for q, p in state["lots"])
+        for got, want in [
+            (result["quantity"][i], state["qty"]),
+            (result["cost_basis"][i], float(state["cost"])),
+            (result["realized_pnl"][i], state["realized"]),
+            (result["fifo_cost_basis"][i], fifo_basis),
+            (result["fifo_realized_pnl"][i], state["fifo_realized"]),
+        ]:
+            worst = max(worst, abs(got - want))
+    ok = worst < 0.01
+    print(f"Check against row-by-row replay ({num_trades:,} trades): max difference {worst:.6f} -> {'OK' if ok else 'MISMATCH'}")
+    return ok
+
+def run_benchmark(num_trades):
+    if not check():
+        print("❌ Lot engine disagrees with the reference replay")
+        sys.exit(1)
+
+    symbols, quantities, prices = make_ledger(num_trades)
+    replay_trades(symbols[:1000], quantities[:1000], prices[:1000]) # Warm up
+
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        replay_trades(symbols, quantities, prices)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"Replayed {num_trades:,} trades over {NUM_SYMBOLS} symbols in {best * 1000:.0f} ms (best of 5)")
+
+    start = time.perf_counter()
+    reference(symbols[:100_000], quantities[:100_000], prices[:100_000])
+    loop_seconds = (time.perf_counter() - start) * num_trades / 100_000
+    print(f"Row-by-row replay (extrapolated from 100,000 trades): {loop_seconds:.1f} s")
+
+    if best < TARGET_SECONDS:
+        print(f"✅ Under {TARGET_SECONDS:.0f} s")
+    else:
+        print(f"❌ Slower than {TARGET_SECONDS:.0f} s")
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,44 @@
+from app.services.sentiment_service import SentimentService
+import sys
+import time
+
+# Compares one-at-a-time analyze() with batched analyze_batch() on CPU.
+# Usage: python benchmark_sentiment.py [num_headlines] [batch_size]
+HEADLINES = [
+    "NVIDIA revenue skyrockets, beating all expectations.",
+    "Apple faces class-action lawsuit over battery issues.",
+    "The stock market remained flat today as investors wait for data.",
+    "Tesla recalls 2 million vehicles over autopilot safety concerns.",
+    "Microsoft announces record cloud growth and raises dividend.",
+    "Amazon shares slip after weaker-than-expected holiday guidance.",
+    "Meta to cut thousands of jobs in latest restructuring.",
+    "ASML orders hold steady despite export restrictions.",
+]
+
+def benchmark(num_headlines, batch_size):
+    print("Initializing Sentiment Service...")
+    service = SentimentService()
+    texts = [f"{HEADLINES[i % len(HEADLINES)]} ({i})" for i in range(num_headlines)]
+
+    # Warm up both paths
+    service.analyze(texts[0])
+    service.analyze_batch(texts[:batch_size], batch_size=batch_size, use_cache=False)
+
+    start = time.perf_counter()
+    single_scores = [service.analyze(text) for text in texts]
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_scores = service.analyze_batch(texts, batch_size=batch_size, use_cache=False)
+    batch_time = time.perf_counter() - start
+
+    max_diff = max(abs(a - b) for a, b in zip(single_scores, batch_scores))
+    print(f"\n{num_headlines} headlines")
+    print(f"analyze() one by one:       {single_time:.2f} s ({num_headlines / single_time:.1f} headlines/s)")
+    print(f"analyze_batch(batch={batch_size}):  {batch_time:.2f} s ({num_headlines / batch_time:.1f} headlines/s)")
+    print(f"Speedup: {single_time / batch_time:.1f}x | max score difference: {max_diff:.4f}")
+
+if __name__ == "__main__":
+    num_headlines = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    benchmark(num_headlines, batch_size)
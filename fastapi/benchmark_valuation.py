@@ -0,0 +1,42 @@
+import sys
+import time
+import requests
+
+BASE_URL = "http://localhost:8000/api/v1"
+
+# Measures GET /users/{id}/portfolio/valuation against a running server.
+# The first call warms the quote cache; the rest show the valuation cost itself.
+# Run the server with QUOTE_PROVIDER=stub to take Yahoo out of the picture.
+# Usage: python benchmark_valuation.py <user_id> [requests]
+
+def run_benchmark(user_id, total):
+    session = requests.Session()
+    url = f"{BASE_URL}/users/{user_id}/portfolio/valuation"
+    try:
+        start = time.perf_counter()
+        r = session.get(url)
+        cold = (time.perf_counter() - start) * 1000
+    except requests.exceptions.ConnectionError:
+        print("Error: Could not connect to server. Is it running on port 8000?")
+        return
+    if r.status_code != 200:
+        print(f"Failed: {r.status_code} {r.text}")
+        return
+    positions = len(r.json()["Positions"])
+
+    latencies = []
+    for _ in range(total):
+        start = time.perf_counter()
+        session.get(url).raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{positions} positions: cold {cold:.1f} ms, warm p50 = {p50:.1f} ms, p99 = {p99:.1f} ms ({total} requests)")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python benchmark_valuation.py <user_id> [requests]")
+        sys.exit(1)
+    run_benchmark(int(sys.argv[1]), int(sys.argv[2]) if len(sys.argv) > 2 else 200)
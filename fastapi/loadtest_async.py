@@ -0,0 +1,148 @@
+import sys
+import os
+import time
+import random
+import asyncio
+import tempfile
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+import httpx
+from fastapi import FastAPI, Depends
+from typing import List
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+# The API routes only use the async path when ASYNC_DATABASE_URL is set; the engine itself
+# is replaced through the get_async_db override below
+os.environ.setdefault("ASYNC_DATABASE_URL", "sqlite+aiosqlite://")
+
+from app.config.database import Base, get_db, get_async_db
+from app.api import endpoints
+from app.cqrs import queries
+from app.cqrs.handlers import CQRSHandler
+from app.domain import models, schemas
+
+# Compares requests/sec of the sync (threadpool) and async (event loop) read paths for
+# GET /users/{id} and GET /users/{id}/transactions under 500 concurrent clients.
+#
+# Usage: python loadtest_async.py [sync_database_url async_database_url]
+# Defaults to a throwaway SQLite file (sqlite + aiosqlite). Requires: pip install httpx aiosqlite
+# The app is served in-process through httpx.ASGITransport, so the numbers measure the
+# server paths (threadpool hop vs. event loop), not the network.
+CONCURRENCY = 500
+REQUESTS_PER_CLIENT = 20
+NUM_USERS = 500
+TRANSACTIONS_PER_USER = 50
+
+STOCKS = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "NVDA", "META"]
+
+def seed(engine):
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [
+            {"UserID": uid, "Username": f"load_{uid}", "Email": f"load_{uid}@example.com",
+             "HashedPassword": "x", "Balance": 1000}
+            for uid in range(1, NUM_USERS + 1)
+        ])
+        conn.execute(models.Transaction.__table__.insert(), [
+            {"UserID": uid, "StockSymbol": rng.choice(STOCKS), "Quantity": rng.randint(1, 20),
+             "PricePerStock": round(rng.uniform(100.0, 500.0), 2)}
+            for uid in range(1, NUM_USERS + 1)
+            for _ in range(TRANSACTIONS_PER_USER)
+        ])
+
+def build_app(sync_url, async_url):
+    # Sync sessions keep their connection until the get_db teardown gets a threadpool slot,
+    # so under this much concurrency the pool has to allow one connection per client
+    sync_engine = create_engine(sync_url, pool_size=50, max_overflow=CONCURRENCY)
+    async_engine = create_async_engine(async_url, pool_size=50, max_overflow=CONCURRENCY)
+    SyncSession = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+    AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    app = FastAPI()
+    # Async path: the real API routes
+    app.include_router(endpoints.router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    # Sync path: the same reads through the sync CQRSHandler in a `def` route
+    def get_handler(db: Session = Depends(get_db)) -> CQRSHandler:
+        return CQRSHandler(db)
+
+    @app.get("/sync/users/{user_id}", response_model=schemas.UserRead)
+    def get_user_sync(user_id: int, handler: CQRSHandler = Depends(get_handler)):
+        return handler.handle_get_user(queries.GetUserQuery(UserID=user_id))
+
+    @app.get("/sync/users/{user_id}/transactions", response_model=List[schemas.TransactionRead])
+    def get_user_transactions_sync(user_id: int, handler: CQRSHandler = Depends(get_handler)):
+        query = queries.GetUserTransactionsQuery(UserID=user_id, Limit=endpoints.DEFAULT_PAGE_SIZE)
+        return handler.handle_get_user_transactions(query)
+
+    return app, sync_engine, async_engine
+
+async def run_load(client, prefix):
+    latencies = []
+
+    async def worker(seed_value):
+        rng = random.Random(seed_value)
+        for i in range(REQUESTS_PER_CLIENT):
+            user_id = rng.randint(1, NUM_USERS)
+            path = f"{prefix}/users/{user_id}" if i % 2 == 0 else f"{prefix}/users/{user_id}/transactions"
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                print(f"  Unexpected {response.status_code} from {path}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total = len(latencies)
+    print(f"  {total} requests in {elapsed:.2f} s -> {total / elapsed:,.0f} req/s | "
+          f"p50 = {latencies[total // 2] * 1000:.1f} ms, p99 = {latencies[int(total * 0.99)] * 1000:.1f} ms")
+
+async def main(sync_url, async_url):
+    app, sync_engine, async_engine = build_app(sync_url, async_url)
+    Base.metadata.drop_all(sync_engine)
+    Base.metadata.create_all(sync_engine)
+    print(f"Seeding {NUM_USERS} users with {TRANSACTIONS_PER_USER} transactions each...")
+    seed(sync_engine)
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", limits=limits) as client:
+        # Warm up both pools
+        await client.get("/sync/users/1")
+        await client.get("/api/v1/users/1")
+
+        print(f"\n--- Sync path (def routes, threadpool), {CONCURRENCY} concurrent clients ---")
+        await run_load(client, "/sync")
+        print(f"\n--- Async path (async routes, AsyncSession), {CONCURRENCY} concurrent clients ---")
+        await run_load(client, "/api/v1")
+
+    sync_engine.dispose()
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        asyncio.run(main(sys.argv[1], sys.argv[2]))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "loadtest.db")
+            asyncio.run(main(f"sqlite:///{path}", f"sqlite+aiosqlite:///{path}"))
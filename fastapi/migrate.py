@@ -0,0 +1,15 @@
+import sys
+import os
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from app.config.migrations import run_migrations
+
+if __name__ == "__main__":
+    # Run once after deploying a version that declares new indexes (the server does not run this on startup)
+    created = run_migrations()
+    if created:
+        print(f"Done! Created {len(created)} indexes: {', '.join(created)}")
+    else:
+        print("Database is up to date.")
@@ -0,0 +1,23 @@
+import sys
+import os
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from app.config.database import SessionLocal
+from app.cqrs import commands
+from app.cqrs.handlers import CQRSHandler
+
+def rebuild_holdings(user_id=None):
+    db = SessionLocal()
+    try:
+        target = f"user {user_id}" if user_id is not None else "all users"
+        print(f"Rebuilding Holdings for {target} from the Transactions ledger...")
+        count = CQRSHandler(db).handle_rebuild_holdings(commands.RebuildHoldingsCommand(UserID=user_id))
+        print(f"Done! {count} positions written.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Usage: python rebuild_holdings.py [user_id]
+    rebuild_holdings(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -16,4 +16,7 @@ if __name__ == "__main__":
     
     # Run the server
     # We use "app.main:app" string for reload=True to work
+    # One worker only: startup seeds Holdings and starts the BackgroundMonitor, and the quote
+    # and portfolio history caches are per process, so extra workers would duplicate the
+    # monitor and serve stale history after trades handled by another worker.
     uvicorn.run("app.main:app", host="127.0.0.1", port=8000, reload=True)
@@ -0,0 +1,39 @@
+from app.services.news_service import NewsService, StubNewsProvider
+import time
+
+class HangingProvider(StubNewsProvider):
+    # Simulates a request that never returns for one ticker
+    def get_news(self, ticker):
+        if ticker == "HANG":
+            time.sleep(30)
+        return super().get_news(ticker)
+
+def test_news():
+    # 500 tickers, 200 ms per request, 10% of requests fail - all offline
+    tickers = [f"T{i:03d}" for i in range(500)]
+    service = NewsService(provider=StubNewsProvider(latency=0.2, failure_rate=0.1, seed=1), max_workers=32, timeout=2, retries=2, backoff=0.1)
+
+    start = time.perf_counter()
+    news = service.fetch_news(tickers)
+    elapsed = time.perf_counter() - start
+
+    print(f"Fetched news for {len(news)}/{len(tickers)} tickers in {elapsed:.2f} s")
+    print(f"Sample: {next(iter(news.items()))}")
+    if len(news) >= len(tickers) * 0.99 and elapsed < 10:
+        print("✅ Test Passed")
+    else:
+        print("❌ Test Failed: expected nearly all tickers within 10 s")
+
+    # Per-request timeout: a hung ticker must not block the others
+    service = NewsService(provider=HangingProvider(), timeout=1, retries=0)
+    start = time.perf_counter()
+    news = service.fetch_news(["AAPL", "HANG", "MSFT"])
+    elapsed = time.perf_counter() - start
+    print(f"\nWith one hung ticker: got {list(news)} in {elapsed:.2f} s")
+    if list(news) == ["AAPL", "MSFT"] and elapsed < 3:
+        print("✅ Test Passed")
+    else:
+        print("❌ Test Failed: hung ticker should time out and be skipped")
+
+if __name__ == "__main__":
+    test_news()
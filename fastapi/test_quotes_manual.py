@@ -0,0 +1,33 @@
+from app.services.quote_service import QuoteService, StubQuoteProvider
+import asyncio
+import time
+
+def test_quotes():
+    # 200 concurrent requests for the same symbol while the upstream takes 300 ms
+    provider = StubQuoteProvider(latency=0.3)
+    service = QuoteService(provider=provider, ttl=1)
+
+    async def burst():
+        return await asyncio.gather(*(service.get_quotes_async(["NVDA"]) for _ in range(200)))
+
+    start = time.perf_counter()
+    results = asyncio.run(burst())
+    elapsed = time.perf_counter() - start
+    print(f"200 concurrent requests -> {provider.calls} upstream call(s) in {elapsed:.2f} s")
+    if provider.calls == 1 and all(r == results[0] for r in results):
+        print("✅ Test Passed")
+    else:
+        print("❌ Test Failed: expected exactly one upstream call")
+
+    # Within the TTL the cache answers; after it expires the next lookup refetches
+    service.get_quotes(["NVDA"])
+    time.sleep(1.1)
+    service.get_quotes(["NVDA"])
+    print(f"\nAfter TTL expiry: {provider.calls} upstream calls, metrics: {service.metrics()}")
+    if provider.calls == 2:
+        print("✅ Test Passed")
+    else:
+        print("❌ Test Failed: expected one refetch after the TTL")
+
+if __name__ == "__main__":
+    test_quotes()
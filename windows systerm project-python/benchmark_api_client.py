@@ -0,0 +1,95 @@
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from model.stock_api import API_URL, StockApiClient
+
+# Compares the buy_stock call chain (balance check, ownership check, transactions reload:
+# three round trips) made with bare requests.get - a new TCP connection per call - against
+# the pooled keep-alive client of model.stock_api.
+# Uses the server at API_URL with an existing user; if it isn't running, a local stub
+# server stands in so the connection overhead can still be measured.
+# Usage: python benchmark_api_client.py [user_id] [iterations]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive, like uvicorn
+    disable_nagle_algorithm = True # headers and body are separate writes
+
+    def do_GET(self):
+        if "/holdings" in self.path or "/transactions" in self.path:
+            payload = []
+        else:
+            payload = {"UserID": 1, "Username": "bench", "Email": "bench@example.com", "Balance": "1000.00"}
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/api/v1"
+
+
+def chain_bare(base_url, user_id):
+    requests.get(f"{base_url}/users/{user_id}").raise_for_status()
+    requests.get(f"{base_url}/users/{user_id}/holdings", params={"symbol": "AAPL"}).raise_for_status()
+    requests.get(f"{base_url}/users/{user_id}/transactions", params={"limit": 50}).raise_for_status()
+
+
+def chain_pooled(client, user_id):
+    client.get_user(user_id)
+    client.get_holdings(user_id, symbol="AAPL")
+    client.get_user_transactions(user_id, limit=50)
+
+
+def measure(name, fn, iterations):
+    fn() # warm up (and open the pooled connection)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:<22} chain mean {statistics.mean(timings):7.2f} ms  p50 {timings[len(timings) // 2]:7.2f} ms  "
+          f"p95 {p95:7.2f} ms  per call {statistics.mean(timings) / 3:6.2f} ms")
+    return statistics.mean(timings)
+
+
+def main():
+    user_id = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    base_url, server = API_URL, None
+    try:
+        requests.get(f"{base_url}/users/{user_id}", timeout=2).raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"Server at {base_url} not usable ({e}); using a local stub server")
+        server, base_url = start_stub_server()
+
+    client = StockApiClient(base_url)
+    print(f"{iterations} x buy_stock chain (3 calls) against {base_url}")
+    bare = measure("requests.get", lambda: chain_bare(base_url, user_id), iterations)
+    pooled = measure("pooled StockApiClient", lambda: chain_pooled(client, user_id), iterations)
+    print(f"Speedup: {bare / pooled:.2f}x ({(bare - pooled) / 3:.2f} ms saved per call)")
+
+    client.close()
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
-import requests
-import yfinance as yf
+import pandas as pd
 from qdrant_client import QdrantClient
 from sentence_transformers import SentenceTransformer
 
@@ -11,6 +10,8 @@ from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.prebuilt import create_react_agent
 
 import model.user as user_model
+from model.quotes import get_last_price, get_last_prices
+from model.stock_api import ApiError, get_api_client
 
 # === Configuration ===
 OLLAMA_URL = "http://localhost:11434"
@@ -20,7 +21,6 @@ COLLECTION_NAME = "stock_qa_collection"
 QDRANT_HOST = "localhost"
 QDRANT_PORT = 6333
 TOP_K = 3
-API_URL = "http://localhost:8000/api/v1"
 
 # === Setup ===
 # Qdrant for RAG
@@ -72,12 +72,12 @@ def get_user_details() -> str:
         if not user_id:
             return "Error: Could not identify current user."
         
-        user_resp = requests.get(f"{API_URL}/users/{user_id}")
-        if user_resp.status_code != 200:
+        try:
+            user = get_api_client().get_user(user_id)
+        except ApiError:
             return "Error: Could not fetch user details."
-            
-        data = user_resp.json()
-        return f"User: {data.get('Username')}, Email: {data.get('Email')}, Balance: ${data.get('Balance')}"
+
+        return f"User: {user.Username}, Email: {user.Email}, Balance: ${user.Balance:.2f}"
     except Exception as e:
         return f"Error fetching user details: {str(e)}"
 
@@ -94,37 +94,27 @@ def buy_stock(symbol: str, quantity: int) -> str:
             return "Error: Could not identify current user."
 
         # Get current price
-        ticker = yf.Ticker(symbol)
-        history = ticker.history(period="1d")
-        if history.empty:
+        current_price = get_last_price(symbol)
+        if current_price is None:
             return f"Error: Could not fetch price for {symbol}."
         
-        current_price = history["Close"].iloc[-1]
         total_cost = current_price * quantity
 
         # Check balance
-        user_resp = requests.get(f"{API_URL}/users/{user_id}")
-        if user_resp.status_code != 200:
+        try:
+            balance = get_api_client().get_user(user_id).Balance
+        except ApiError:
             return "Error: Could not fetch user balance."
         
-        balance = float(user_resp.json().get("Balance", 0.0))
-        
         if balance < total_cost:
             return f"Insufficient funds. You have ${balance:.2f}, but need ${total_cost:.2f}."
 
         # Execute Transaction
-        transaction_data = {
-            "UserID": user_id,
-            "StockSymbol": symbol.upper(),
-            "Quantity": quantity,
-            "PricePerStock": round(current_price, 2)
-        }
-        
-        resp = requests.post(f"{API_URL}/transactions", json=transaction_data)
-        if resp.status_code == 201:
-            return f"Successfully bought {quantity} shares of {symbol} at ${current_price:.2f}. Total: ${total_cost:.2f}."
-        else:
-            return f"Transaction failed: {resp.text}"
+        try:
+            get_api_client().create_transaction(user_id, symbol.upper(), quantity, current_price)
+        except ApiError as e:
+            return f"Transaction failed: {e.detail}"
+        return f"Successfully bought {quantity} shares of {symbol} at ${current_price:.2f}. Total: ${total_cost:.2f}."
 
     except Exception as e:
         return f"Error executing buy: {str(e)}"
@@ -142,37 +132,28 @@ def sell_stock(symbol: str, quantity: int) -> str:
             return "Error: Could not identify current user."
 
         # Get current price
-        ticker = yf.Ticker(symbol)
-        history = ticker.history(period="1d")
-        if history.empty:
+        current_price = get_last_price(symbol)
+        if current_price is None:
             return f"Error: Could not fetch price for {symbol}."
-        current_price = history["Close"].iloc[-1]
 
         # Check ownership
-        resp = requests.get(f"{API_URL}/users/{user_id}/transactions")
-        if resp.status_code != 200:
+        try:
+            holdings = get_api_client().get_holdings(user_id, symbol=symbol.upper())
+        except ApiError:
             return "Error: Could not fetch portfolio."
-        
-        transactions = resp.json()
-        owned_qty = sum(t.get("Quantity", 0) for t in transactions if t.get("StockSymbol") == symbol.upper())
+
+        owned_qty = holdings[0].Quantity if holdings else 0
         
         if owned_qty < quantity:
             return f"Insufficient shares. You own {owned_qty} shares of {symbol}."
 
         # Execute Transaction (Negative quantity for sell)
-        transaction_data = {
-            "UserID": user_id,
-            "StockSymbol": symbol.upper(),
-            "Quantity": -1 * quantity, 
-            "PricePerStock": round(current_price, 2)
-        }
-        
-        resp = requests.post(f"{API_URL}/transactions", json=transaction_data)
-        if resp.status_code == 201:
-            total_value = current_price * quantity
-            return f"Successfully sold {quantity} shares of {symbol} at ${current_price:.2f}. Total value: ${total_value:.2f}."
-        else:
-            return f"Transaction failed: {resp.text}"
+        try:
+            get_api_client().create_transaction(user_id, symbol.upper(), -1 * quantity, current_price)
+        except ApiError as e:
+            return f"Transaction failed: {e.detail}"
+        total_value = current_price * quantity
+        return f"Successfully sold {quantity} shares of {symbol} at ${current_price:.2f}. Total value: ${total_value:.2f}."
 
     except Exception as e:
         return f"Error executing sell: {str(e)}"
@@ -181,11 +162,9 @@ def sell_stock(symbol: str, quantity: int) -> str:
 def get_stock_price(symbol: str) -> str:
     """Gets the current price of a stock."""
     try:
-        ticker = yf.Ticker(symbol)
-        history = ticker.history(period="1d")
-        if history.empty:
+        price = get_last_price(symbol)
+        if price is None:
             return f"Could not find price for {symbol}."
-        price = history["Close"].iloc[-1]
         return f"The current price of {symbol.upper()} is ${price:.2f}."
     except Exception as e:
         return f"Error fetching price: {str(e)}"
@@ -197,20 +176,19 @@ def check_portfolio_risks(dummy: str = "") -> str:
     Returns a summary of any active alerts.
     """
     try:
-        # Currently hardcoded to localhost:8000, consistent with other tools
-        response = requests.get("http://localhost:8000/api/v1/alerts/unread")
-        if response.status_code == 200:
-            alerts = response.json()
-            if not alerts:
-                return "✅ SUCCESS: I have scanned the database for negative news on your portfolio stocks. No high-risk alerts were found. Your portfolio sentiment is currently stable/positive."
-            
-            summary = "⚠️ **High Risk Alerts Detected:**\n"
-            for alert in alerts:
-                summary += f"- **{alert['stock_symbol']}**: {alert['headline']} (Sentiment: {alert['sentiment_score']:.2f})\n"
-            
-            return summary
-        else:
-            return f"Error checking alerts: {response.status_code}"
+        try:
+            alerts = get_api_client().get_alerts(unread_only=True)
+        except ApiError as e:
+            return f"Error checking alerts: {e.status_code}"
+
+        if not alerts:
+            return "✅ SUCCESS: I have scanned the database for negative news on your portfolio stocks. No high-risk alerts were found. Your portfolio sentiment is currently stable/positive."
+
+        summary = "⚠️ **High Risk Alerts Detected:**\n"
+        for alert in alerts:
+            summary += f"- **{alert.stock_symbol}**: {alert.headline} (Sentiment: {alert.sentiment_score:.2f})\n"
+
+        return summary
     except Exception as e:
         return f"Failed to connect to risk service: {e}"
 
@@ -222,45 +200,30 @@ def get_user_portfolio() -> str:
         if not user_id:
             return "Error: Could not identify current user."
         
-        # 1. Fetch all transactions
-        resp = requests.get(f"{API_URL}/users/{user_id}/transactions")
-        if resp.status_code != 200:
-            return "Error: Could not fetch transactions to calculate portfolio."
-            
-        transactions = resp.json()
-        
-        # 2. Aggregate quantity per stock
-        holdings = {}
-        for t in transactions:
-            symbol = t['StockSymbol'].upper()
-            qty = t['Quantity']
-            holdings[symbol] = holdings.get(symbol, 0) + qty
-            
-        # Filter out zero or negative holdings (if any)
-        # Assuming we only care about what they currently HOLD > 0
-        current_holdings = {k: v for k, v in holdings.items() if v > 0}
+        # 1. Fetch current holdings (aggregated server-side, only quantities > 0)
+        try:
+            holdings = get_api_client().get_holdings(user_id)
+        except ApiError:
+            return "Error: Could not fetch holdings to calculate portfolio."
+
+        # 2. Map symbol -> quantity
+        current_holdings = {h.StockSymbol.upper(): h.Quantity for h in holdings}
         
         if not current_holdings:
             return "You currently have no stocks in your portfolio."
 
-        # 3. Fetch current prices and calculate value
-        summary_lines = []
-        total_portfolio_value = 0.0
-        
-        for symbol, qty in current_holdings.items():
-            try:
-                ticker = yf.Ticker(symbol)
-                # fast fetch
-                price = 0.0
-                history = ticker.history(period="1d")
-                if not history.empty:
-                    price = history["Close"].iloc[-1]
-                
-                value = price * qty
-                total_portfolio_value += value
-                summary_lines.append(f"- {symbol}: {qty} shares @ ${price:.2f} = ${value:.2f}")
-            except Exception as e:
-                summary_lines.append(f"- {symbol}: {qty} shares (Error fetching price)")
+        # 3. Fetch every price at once and value the positions in one vectorized step
+        portfolio = pd.DataFrame({"Quantity": pd.Series(current_holdings)})
+        prices = get_last_prices(list(current_holdings))
+        portfolio["Price"] = portfolio.index.map(prices).astype(float)
+        portfolio["Value"] = portfolio["Quantity"] * portfolio["Price"]
+        total_portfolio_value = portfolio["Value"].sum() # NaN (no price) is skipped
+
+        summary_lines = [
+            f"- {symbol}: {int(row.Quantity)} shares (Error fetching price)" if pd.isna(row.Price)
+            else f"- {symbol}: {int(row.Quantity)} shares @ ${row.Price:.2f} = ${row.Value:.2f}"
+            for symbol, row in portfolio.iterrows()
+        ]
 
         summary = "Current Portfolio:\n" + "\n".join(summary_lines)
         summary += f"\n\nTotal Portfolio Value: ${total_portfolio_value:.2f}"
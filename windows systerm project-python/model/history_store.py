@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from model.market_data import MarketDataProvider, OHLCV_COLUMNS, PERIOD_OFFSETS
+
+# === Local price-history store ===
+# Keeps the bars of every (symbol, interval) already fetched in <directory>/<SYMBOL>_<interval>.npy
+# (one structured array: timestamp + OHLCV columns) plus a small .json with metadata.
+# A request only downloads the bars after the last stored one, and is served from
+# disk alone when the upstream can't be reached.
+
+BAR_DTYPE = np.dtype([("Timestamp", "i8")] + [(column, "f8") for column in OHLCV_COLUMNS])
+
+# Upstream periods tried, smallest first, when only the tail is missing
+TAIL_PERIODS = ["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y"]
+
+# How long stored bars are considered current before the tail is refreshed
+REFRESH_SECONDS = {"1m": 60, "5m": 300, "15m": 300, "30m": 300, "1h": 300, "1d": 3600, "1wk": 3600}
+
+
+class HistoryStore(MarketDataProvider):
+    def __init__(self, upstream: MarketDataProvider, directory: str):
+        self.upstream = upstream
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.memory: Dict[Tuple[str, str], Tuple[pd.DataFrame, dict]] = {}
+        self.failed_at: Dict[Tuple[str, str], float] = {} # Don't retry an offline upstream on every call
+        # Callers may be worker threads: one lock per (symbol, interval) keeps two fetches of the
+        # same series from writing the same files, without serializing different symbols
+        self.locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self.locks_lock = threading.Lock()
+
+    # Last prices should be live, so they go straight to the upstream
+    def get_last_price(self, symbol):
+        return self.upstream.get_last_price(symbol)
+
+    def get_last_prices(self, symbols):
+        return self.upstream.get_last_prices(symbols)
+
+    def _path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.directory, f"{symbol.upper()}_{interval}")
+
+    def _load(self, symbol: str, interval: str) -> Tuple[pd.DataFrame, dict]:
+        key = (symbol.upper(), interval)
+        if key in self.memory:
+            return self.memory[key]
+
+        path = self._path(symbol, interval)
+        data, meta = pd.DataFrame(columns=OHLCV_COLUMNS), {}
+        try:
+            if os.path.exists(path + ".npy") and os.path.exists(path + ".json"):
+                bars = np.load(path + ".npy", mmap_mode="r")
+                with open(path + ".json") as f:
+                    meta = json.load(f)
+                index = pd.to_datetime(bars["Timestamp"], utc=True)
+                if meta.get("tz"):
+                    index = index.tz_convert(meta["tz"])
+                else:
+                    index = index.tz_localize(None)
+                data = pd.DataFrame({column: np.asarray(bars[column]) for column in OHLCV_COLUMNS}, index=index)
+        except Exception as e:
+            print(f"Error reading stored history for {symbol} ({interval}): {e}")
+            data, meta = pd.DataFrame(columns=OHLCV_COLUMNS), {}
+
+        self.memory[key] = (data, meta)
+        return data, meta
+
+    def _save(self, symbol: str, interval: str, data: pd.DataFrame, meta: dict):
+        self.memory[(symbol.upper(), interval)] = (data, meta)
+
+        index = pd.DatetimeIndex(data.index)
+        meta["tz"] = str(index.tz) if index.tz is not None else None
+        timestamps = (index.tz_convert("UTC") if index.tz is not None else index).as_unit("ns").asi8
+
+        bars = np.empty(len(data), dtype=BAR_DTYPE)
+        bars["Timestamp"] = timestamps
+        for column in OHLCV_COLUMNS:
+            bars[column] = data[column].to_numpy(dtype=np.float64) if column in data.columns else np.nan
+
+        path = self._path(symbol, interval)
+        try:
+            # Write to temp files first so a crash never leaves a half-written store
+            with open(path + ".tmp.npy", "wb") as f:
+                np.save(f, bars)
+            with open(path + ".tmp.json", "w") as f:
+                json.dump(meta, f)
+            os.replace(path + ".tmp.npy", path + ".npy")
+            os.replace(path + ".tmp.json", path + ".json")
+        except Exception as e:
+            print(f"Error saving history for {symbol} ({interval}): {e}")
+
+    def _merge(self, stored: pd.DataFrame, fetched: pd.DataFrame) -> pd.DataFrame:
+        if stored.empty:
+            return fetched
+        if fetched.empty:
+            return stored
+        if stored.index.tz is not None and fetched.index.tz is not None:
+            fetched = fetched.tz_convert(stored.index.tz)
+        # The last stored bar may have been incomplete - the fetched one replaces it
+        return pd.concat([stored[stored.index < fetched.index[0]], fetched])
+
+    def _tail_period(self, last_bar: pd.Timestamp) -> str:
+        now = pd.Timestamp.now(tz=last_bar.tz)
+        for period in TAIL_PERIODS:
+            if last_bar > now - PERIOD_OFFSETS[period]:
+                return period
+        return TAIL_PERIODS[-1]
+
+    def get_history(self, symbol, period="1y", interval="1d"):
+        with self.locks_lock:
+            lock = self.locks.setdefault((symbol.upper(), interval), threading.Lock())
+        with lock:
+            return self._get_history(symbol, period, interval)
+
+    def _get_history(self, symbol, period, interval):
+        data, meta = self._load(symbol, interval)
+        now = time.time()
+        offset = PERIOD_OFFSETS.get(period)
+
+        # Stored bars must reach back far enough for this period
+        covered_from = meta.get("covered_from")
+        needs_full = data.empty or covered_from is None or (offset is not None and pd.Timestamp(covered_from, unit="s") > pd.Timestamp(now, unit="s") - offset)
+        refresh_seconds = REFRESH_SECONDS.get(interval, 300)
+        needs_tail = now - meta.get("refreshed_at", 0) > refresh_seconds
+        recently_failed = now - self.failed_at.get((symbol.upper(), interval), 0) < refresh_seconds
+
+        if (needs_full or needs_tail) and not (recently_failed and not data.empty):
+            fetch_period = period if needs_full else self._tail_period(data.index[-1])
+            fetched = self.upstream.get_history(symbol, period=fetch_period, interval=interval)
+            if fetched.empty: # Offline or unknown symbol - keep serving what is stored
+                self.failed_at[(symbol.upper(), interval)] = now
+            else:
+                meta = dict(meta)
+                if needs_full:
+                    start = (pd.Timestamp(now, unit="s") - offset).timestamp() if offset is not None else 0
+                    meta["covered_from"] = min(meta.get("covered_from") or start, start)
+                meta["refreshed_at"] = now
+                data = self._merge(data, fetched)
+                self._save(symbol, interval, data, meta)
+
+        if offset is not None and not data.empty:
+            data = data[data.index > data.index[-1] - offset]
+        return data
+
+
+def wrap_with_store(provider: MarketDataProvider) -> MarketDataProvider:
+    """
+    Puts a HistoryStore in front of the provider. MARKET_DATA_STORE sets the directory
+    (default py_cache/history); "off" disables the store.
+    """
+    directory = os.getenv("MARKET_DATA_STORE", os.path.join(os.getcwd(), "py_cache", "history"))
+    if directory.lower() == "off":
+        return provider
+    return HistoryStore(provider, directory)
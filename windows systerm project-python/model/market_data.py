@@ -0,0 +1,241 @@
+import os
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# === Market data providers ===
+# Every price lookup in the client (views and agent tools) goes through get_provider(),
+# so caching, batching or an offline backend only has to be added here.
+#
+# MARKET_DATA_PROVIDER selects the backend:
+#   yfinance (default)     - live data from Yahoo Finance
+#   replay:<directory>     - recorded bars from <directory>/<SYMBOL>.csv or .parquet
+#   synthetic              - deterministic random walk, no network needed
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1wk": pd.DateOffset(weeks=1),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+}
+
+INTERVAL_FREQ = {
+    "1m": "1min",
+    "5m": "5min",
+    "15m": "15min",
+    "30m": "30min",
+    "1h": "1h",
+    "1d": "1D",
+    "1wk": "1W",
+}
+
+
+class MarketDataProvider(ABC):
+    """
+    Interface for price data. get_history returns a DataFrame indexed by timestamp
+    with flat Open/High/Low/Close/Volume columns (empty if nothing was found).
+    """
+    @abstractmethod
+    def get_history(self, symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+        ...
+
+    @abstractmethod
+    def get_last_price(self, symbol: str) -> Optional[float]:
+        ...
+
+    @abstractmethod
+    def get_last_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        ...
+
+
+class HistoryPricedProvider(MarketDataProvider):
+    """Base for backends without a quote endpoint: last prices are the latest daily close."""
+    def get_last_price(self, symbol: str) -> Optional[float]:
+        history = self.get_history(symbol, period="5d", interval="1d")
+        if history.empty:
+            return None
+        return float(history["Close"].iloc[-1])
+
+    def get_last_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        prices = {}
+        for symbol in symbols:
+            price = self.get_last_price(symbol)
+            if price is not None:
+                prices[symbol] = price
+        return prices
+
+
+def _flatten(data: pd.DataFrame, symbol: str) -> pd.DataFrame:
+    # yfinance returns MultiIndex columns (field, ticker) for downloads
+    if isinstance(data.columns, pd.MultiIndex):
+        if symbol in data.columns.get_level_values(-1):
+            data = data.xs(symbol, axis=1, level=-1)
+        else:
+            data = data.droplevel(-1, axis=1)
+    return data[[c for c in OHLCV_COLUMNS if c in data.columns]]
+
+
+class YFinanceProvider(MarketDataProvider):
+    def __init__(self):
+        import yfinance as yf
+        self.yf = yf
+
+        # --- Fix for timezone cache (critical for Windows users with non-ASCII names) ---
+        cache_dir = os.path.join(os.getcwd(), "py_cache")
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        try:
+            yf.set_tz_cache_location(cache_dir)
+        except:
+            pass
+
+    def get_history(self, symbol, period="1y", interval="1d"):
+        try:
+            data = self.yf.download(symbol, period=period, interval=interval, progress=False, auto_adjust=False)
+        except Exception as e:
+            print(f"Error fetching history for {symbol}: {e}")
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        if data is None or data.empty:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        return _flatten(data, symbol)
+
+    def get_last_price(self, symbol):
+        try:
+            history = self.yf.Ticker(symbol).history(period="1d")
+        except Exception as e:
+            print(f"Error fetching price for {symbol}: {e}")
+            return None
+        if history.empty:
+            return None
+        return float(history["Close"].iloc[-1])
+
+    def get_last_prices(self, symbols):
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        # One multi-symbol download instead of a Ticker().history() round trip per symbol
+        try:
+            data = self.yf.download(symbols, period="5d", interval="1d", progress=False, auto_adjust=False, group_by="ticker")
+        except Exception as e:
+            print(f"Error fetching prices for {symbols}: {e}")
+            return {}
+        if data is None or data.empty:
+            return {}
+
+        closes = data.xs("Close", axis=1, level=-1) if isinstance(data.columns, pd.MultiIndex) else data[["Close"]].set_axis(symbols, axis=1)
+        last = closes.ffill().iloc[-1].dropna()
+        return {symbol: float(price) for symbol, price in last.items() if symbol in symbols}
+
+
+class ReplayProvider(HistoryPricedProvider):
+    """
+    Serves recorded bars from <directory>/<SYMBOL>.csv or <SYMBOL>.parquet
+    (a date/time index column followed by OHLCV columns). The requested period is
+    counted back from the last recorded bar, and bars are resampled to the interval.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.frames: Dict[str, pd.DataFrame] = {}
+
+    def _load(self, symbol: str) -> pd.DataFrame:
+        if symbol not in self.frames:
+            base = os.path.join(self.directory, symbol.upper())
+            if os.path.exists(base + ".parquet"):
+                data = pd.read_parquet(base + ".parquet")
+            elif os.path.exists(base + ".csv"):
+                data = pd.read_csv(base + ".csv", index_col=0, parse_dates=True)
+            else:
+                data = pd.DataFrame(columns=OHLCV_COLUMNS)
+            self.frames[symbol] = data.sort_index()
+        return self.frames[symbol]
+
+    def get_history(self, symbol, period="1y", interval="1d"):
+        data = self._load(symbol)
+        if data.empty:
+            return data
+        if period in PERIOD_OFFSETS:
+            data = data[data.index > data.index[-1] - PERIOD_OFFSETS[period]]
+        if interval in INTERVAL_FREQ:
+            data = data.resample(INTERVAL_FREQ[interval]).agg({
+                "Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"
+            }).dropna(subset=["Close"])
+        return data
+
+
+class SyntheticProvider(HistoryPricedProvider):
+    """
+    Deterministic geometric random walk per symbol. The same symbol, interval and day
+    always produce the same bars (shorter periods are slices of the same walk), so
+    tests and benchmarks are repeatable.
+    """
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self.series: Dict[str, pd.DataFrame] = {}
+
+    def _generate(self, symbol: str, interval: str) -> pd.DataFrame:
+        end = pd.Timestamp(datetime.now().date())
+        key = f"{self.seed}:{symbol.upper()}:{interval}:{end.date()}"
+        if key in self.series:
+            return self.series[key]
+
+        # Daily/weekly bars cover 5 years, intraday bars 60 days (like Yahoo's limits)
+        span = pd.DateOffset(years=5) if interval in ("1d", "1wk") else pd.DateOffset(days=60)
+        index = pd.date_range(end - span, end, freq=INTERVAL_FREQ.get(interval, "1D"), inclusive="right")
+        if interval == "1d":
+            index = index[index.dayofweek < 5]
+
+        rng = np.random.default_rng(zlib.crc32(key.encode()))
+        base_price = 50 + zlib.crc32(symbol.upper().encode()) % 450
+        close = base_price * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+        open_ = np.concatenate(([base_price], close[:-1]))[:len(close)]
+        spread = np.abs(rng.normal(0, 0.005, len(index))) * close
+
+        data = pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(open_, close) + spread,
+            "Low": np.minimum(open_, close) - spread,
+            "Close": close,
+            "Volume": rng.integers(100_000, 10_000_000, len(index)),
+        }, index=index)
+        self.series[key] = data
+        return data
+
+    def get_history(self, symbol, period="1y", interval="1d"):
+        data = self._generate(symbol, interval)
+        if period in PERIOD_OFFSETS and not data.empty:
+            data = data[data.index > data.index[-1] - PERIOD_OFFSETS[period]]
+        return data
+
+
+_provider: Optional[MarketDataProvider] = None
+
+def create_provider(spec: str) -> MarketDataProvider:
+    if spec.startswith("replay:"):
+        return ReplayProvider(spec[len("replay:"):])
+    if spec == "synthetic":
+        return SyntheticProvider()
+    # Live data goes through the local history store so charts only download new bars
+    from model.history_store import wrap_with_store
+    return wrap_with_store(YFinanceProvider())
+
+def get_provider() -> MarketDataProvider:
+    global _provider
+    if _provider is None:
+        _provider = create_provider(os.getenv("MARKET_DATA_PROVIDER", "yfinance"))
+    return _provider
+
+def set_provider(provider: MarketDataProvider):
+    """Replaces the process-wide provider (e.g. with a SyntheticProvider in tests)."""
+    global _provider
+    _provider = provider
@@ -0,0 +1,31 @@
+from typing import Dict, Iterable, Optional
+
+import httpx
+
+from model.market_data import get_provider
+from model.stock_api import ApiError, get_api_client
+
+# === Last prices ===
+# Views and agent tools ask the backend's shared quote cache (GET /quotes) for prices.
+# The market data provider is only called for symbols the server couldn't price, or
+# when the server can't be reached.
+
+
+def get_last_prices(symbols: Iterable[str], api=None) -> Dict[str, float]:
+    """Last price per upper-case symbol; symbols without a price are left out."""
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    if not symbols:
+        return {}
+    try:
+        prices = (api or get_api_client()).get_prices(symbols)
+    except (ApiError, httpx.HTTPError) as e:
+        print(f"Quote endpoint unavailable, using market data provider: {e}")
+        prices = {}
+    missing = [symbol for symbol in symbols if symbol not in prices]
+    if missing:
+        prices.update(get_provider().get_last_prices(missing))
+    return prices
+
+
+def get_last_price(symbol: str, api=None) -> Optional[float]:
+    return get_last_prices([symbol], api).get(symbol.strip().upper())
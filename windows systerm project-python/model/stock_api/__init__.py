@@ -0,0 +1,21 @@
+from model.stock_api.client import (
+    API_URL,
+    MAX_QUOTE_SYMBOLS,
+    ApiError,
+    AsyncStockApiClient,
+    StockApiClient,
+    get_api_client,
+    set_api_client,
+)
+from model.stock_api.models import (
+    AlertRead,
+    HoldingRead,
+    PortfolioHistory,
+    PortfolioHistoryPoint,
+    PortfolioValuation,
+    PositionCostBasis,
+    PositionValuation,
+    QuoteRead,
+    TransactionRead,
+    UserRead,
+)
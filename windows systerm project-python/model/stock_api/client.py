@@ -0,0 +1,436 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, AsyncIterator, List, NamedTuple, Optional
+
+import httpx
+
+from model.stock_api.models import (
+    AlertRead, HoldingRead, PortfolioHistory, PortfolioValuation, PositionCostBasis,
+    QuoteRead, TransactionRead, UserRead,
+)
+
+# === Stock Project API client ===
+# StockApiClient (blocking, for views' worker threads and agent tools) and
+# AsyncStockApiClient (asyncio, for fanning out many calls at once) expose the same
+# typed methods. Both keep connections alive and reuse them, send
+# Accept-Encoding: gzip (the server compresses larger responses), and speak HTTP/2
+# when the h2 package is installed and the server offers it (over TLS; plain
+# http://localhost stays on HTTP/1.1).
+#
+# API_URL overrides the server address (default http://localhost:8000/api/v1).
+
+API_URL = os.getenv("API_URL", "http://localhost:8000/api/v1")
+
+# A stopped server fails fast, a slow query still completes
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=3.05)
+
+# Enough connections for the worker thread pools of every open window
+POOL_SIZE = 16
+
+MAX_QUOTE_SYMBOLS = 200 # Server limit per /quotes request
+
+# Failed connections are retried for every method (the request never reached the
+# server); these statuses only for idempotent methods, so a transaction is never
+# posted twice.
+RETRIES = 2
+RETRY_STATUSES = {502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+RETRY_BACKOFF = 0.2
+
+try:
+    import h2 # noqa: F401 - only needed for HTTP/2
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+
+class ApiError(Exception):
+    """The server answered with an error status. `detail` is FastAPI's error detail."""
+    def __init__(self, status_code: int, detail):
+        super().__init__(f"{status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _check(response: httpx.Response):
+    if response.is_success:
+        return
+    try:
+        detail = response.json().get("detail", response.text)
+    except (ValueError, AttributeError):
+        detail = response.text
+    raise ApiError(response.status_code, detail)
+
+
+def _should_retry(method: str, response: httpx.Response, attempt: int, retries: int) -> bool:
+    return response.status_code in RETRY_STATUSES and method in IDEMPOTENT_METHODS and attempt < retries
+
+
+def _chunks(symbols: List[str], size: int = MAX_QUOTE_SYMBOLS) -> List[List[str]]:
+    return [symbols[i:i + size] for i in range(0, len(symbols), size)]
+
+
+def _normalize_symbols(symbols: Iterable[str]) -> List[str]:
+    # Same rule as the server: upper case, no blanks or duplicates, caller's order
+    return list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+
+
+class Call(NamedTuple):
+    method: str
+    path: str
+    params: Optional[dict] = None
+    body: Optional[dict] = None
+    parse: Optional[Callable] = None # JSON -> result; None for no content
+
+
+def _params(**values) -> dict:
+    return {key: value for key, value in values.items() if value is not None}
+
+
+def _transaction_params(limit, after_id, sort, descending, after_value) -> dict:
+    # after_value is the sort column value of the after_id row (the keyset cursor)
+    if isinstance(after_value, datetime):
+        after_value = after_value.isoformat()
+    return _params(limit=limit, after_id=after_id, sort=sort, order="desc" if descending else "asc",
+                   after_value=None if after_value is None else str(after_value))
+
+
+class _Calls:
+    """The API's endpoints as Call descriptions, shared by the sync and async clients."""
+
+    # Users
+    @staticmethod
+    def create_user(username: str, email: str, password: str) -> Call:
+        return Call("POST", "/users", body={"Username": username, "Email": email, "Password": password}, parse=UserRead.from_json)
+
+    @staticmethod
+    def login(username: str, password: str) -> Call:
+        return Call("POST", "/login", body={"Username": username, "Password": password}, parse=UserRead.from_json)
+
+    @staticmethod
+    def get_users() -> Call:
+        return Call("GET", "/users", parse=UserRead.from_json_list)
+
+    @staticmethod
+    def get_user(user_id: int) -> Call:
+        return Call("GET", f"/users/{user_id}", parse=UserRead.from_json)
+
+    @staticmethod
+    def update_user(user_id: int, username: str, email: str) -> Call:
+        return Call("PUT", f"/users/{user_id}", body={"Username": username, "Email": email}, parse=UserRead.from_json)
+
+    @staticmethod
+    def delete_user(user_id: int) -> Call:
+        return Call("DELETE", f"/users/{user_id}")
+
+    # Transactions
+    @staticmethod
+    def create_transaction(user_id: int, symbol: str, quantity: int, price: float) -> Call:
+        body = {"UserID": user_id, "StockSymbol": symbol, "Quantity": quantity, "PricePerStock": round(price, 2)}
+        return Call("POST", "/transactions", body=body, parse=TransactionRead.from_json)
+
+    @staticmethod
+    def get_transaction(transaction_id: int) -> Call:
+        return Call("GET", f"/transactions/{transaction_id}", parse=TransactionRead.from_json)
+
+    @staticmethod
+    def get_user_transactions(user_id: int, limit: Optional[int] = None, after_id: Optional[int] = None,
+                              sort: str = "TransactionID", descending: bool = True, after_value=None) -> Call:
+        params = _transaction_params(limit, after_id, sort, descending, after_value)
+        return Call("GET", f"/users/{user_id}/transactions", params=params, parse=TransactionRead.from_json_list)
+
+    @staticmethod
+    def stream_user_transactions(user_id: int, limit: Optional[int] = None, after_id: Optional[int] = None,
+                                 sort: str = "TransactionID", descending: bool = True, after_value=None) -> Call:
+        params = dict(_transaction_params(limit, after_id, sort, descending, after_value), stream="true")
+        return Call("GET", f"/users/{user_id}/transactions", params=params, parse=TransactionRead.from_json)
+
+    # Portfolio
+    @staticmethod
+    def get_holdings(user_id: int, symbol: Optional[str] = None) -> Call:
+        return Call("GET", f"/users/{user_id}/holdings", params=_params(symbol=symbol), parse=HoldingRead.from_json_list)
+
+    @staticmethod
+    def get_portfolio_valuation(user_id: int) -> Call:
+        return Call("GET", f"/users/{user_id}/portfolio/valuation", parse=PortfolioValuation.from_json)
+
+    @staticmethod
+    def get_cost_basis(user_id: int, method: str = "average") -> Call:
+        return Call("GET", f"/users/{user_id}/portfolio/cost-basis", params={"method": method}, parse=PositionCostBasis.from_json_list)
+
+    @staticmethod
+    def get_portfolio_history(user_id: int, period: str = "1y", interval: str = "1d") -> Call:
+        return Call("GET", f"/users/{user_id}/portfolio/history", params={"period": period, "interval": interval}, parse=PortfolioHistory.from_json)
+
+    # Quotes
+    @staticmethod
+    def get_quotes(symbols: List[str]) -> Call:
+        return Call("GET", "/quotes", params={"symbols": ",".join(symbols)}, parse=QuoteRead.from_json_list)
+
+    # Alerts
+    @staticmethod
+    def get_alerts(unread_only: bool = False) -> Call:
+        return Call("GET", "/alerts/unread" if unread_only else "/alerts", parse=AlertRead.from_json_list)
+
+    @staticmethod
+    def mark_alert_read(alert_id: int) -> Call:
+        return Call("POST", f"/alerts/{alert_id}/read")
+
+
+class StockApiClient:
+    """
+    Blocking client. One instance is shared by the whole process (get_api_client());
+    httpx.Client is safe to use from several worker threads at once.
+    """
+    def __init__(self, base_url: str = API_URL, timeout=DEFAULT_TIMEOUT, retries: int = RETRIES, pool_size: int = POOL_SIZE, http2: bool = HTTP2):
+        self.retries = retries
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.http = httpx.Client(
+            base_url=base_url.rstrip("/"),
+            timeout=timeout,
+            headers={"Accept": "application/json"},
+            transport=httpx.HTTPTransport(retries=retries, http2=http2, limits=limits),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.http.close()
+
+    def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Raw request (path relative to the base URL), with status retries for idempotent methods."""
+        for attempt in range(self.retries + 1):
+            response = self.http.request(method, path, **kwargs)
+            if not _should_retry(method, response, attempt, self.retries):
+                return response
+            time.sleep(RETRY_BACKOFF * 2 ** attempt)
+        return response
+
+    def call(self, call: Call):
+        response = self.request(call.method, call.path, params=call.params, json=call.body)
+        _check(response)
+        return call.parse(response.json()) if call.parse else None
+
+    # Users
+    def create_user(self, username: str, email: str, password: str) -> UserRead:
+        return self.call(_Calls.create_user(username, email, password))
+
+    def login(self, username: str, password: str) -> UserRead:
+        return self.call(_Calls.login(username, password))
+
+    def get_users(self) -> List[UserRead]:
+        return self.call(_Calls.get_users())
+
+    def get_user(self, user_id: int) -> UserRead:
+        return self.call(_Calls.get_user(user_id))
+
+    def update_user(self, user_id: int, username: str, email: str) -> UserRead:
+        return self.call(_Calls.update_user(user_id, username, email))
+
+    def delete_user(self, user_id: int):
+        return self.call(_Calls.delete_user(user_id))
+
+    # Transactions
+    def create_transaction(self, user_id: int, symbol: str, quantity: int, price: float) -> TransactionRead:
+        """Buys (quantity > 0) or sells (quantity < 0). The price is rounded to cents."""
+        return self.call(_Calls.create_transaction(user_id, symbol, quantity, price))
+
+    def get_transaction(self, transaction_id: int) -> TransactionRead:
+        return self.call(_Calls.get_transaction(transaction_id))
+
+    def get_user_transactions(self, user_id: int, limit: Optional[int] = None, after_id: Optional[int] = None,
+                              sort: str = "TransactionID", descending: bool = True, after_value=None) -> List[TransactionRead]:
+        """
+        One page, newest first by default, or sorted by another TransactionRead field
+        (ties broken by TransactionID). For the next page pass the last row's TransactionID
+        as after_id and, when sorting by another field, that row's value as after_value.
+        """
+        return self.call(_Calls.get_user_transactions(user_id, limit, after_id, sort, descending, after_value))
+
+    def iter_user_transactions(self, user_id: int, limit: Optional[int] = None, after_id: Optional[int] = None,
+                               sort: str = "TransactionID", descending: bool = True, after_value=None) -> Iterator[TransactionRead]:
+        """Every transaction (in the same order as get_user_transactions) over one NDJSON stream, yielded as it arrives."""
+        call = _Calls.stream_user_transactions(user_id, limit, after_id, sort, descending, after_value)
+        with self.http.stream(call.method, call.path, params=call.params) as response:
+            if not response.is_success:
+                response.read()
+                _check(response)
+            for line in response.iter_lines():
+                if line:
+                    yield call.parse(json.loads(line))
+
+    # Portfolio
+    def get_holdings(self, user_id: int, symbol: Optional[str] = None) -> List[HoldingRead]:
+        return self.call(_Calls.get_holdings(user_id, symbol))
+
+    def get_portfolio_valuation(self, user_id: int) -> PortfolioValuation:
+        return self.call(_Calls.get_portfolio_valuation(user_id))
+
+    def get_cost_basis(self, user_id: int, method: str = "average") -> List[PositionCostBasis]:
+        return self.call(_Calls.get_cost_basis(user_id, method))
+
+    def get_portfolio_history(self, user_id: int, period: str = "1y", interval: str = "1d") -> PortfolioHistory:
+        return self.call(_Calls.get_portfolio_history(user_id, period, interval))
+
+    # Quotes
+    def get_quotes(self, symbols: Iterable[str]) -> List[QuoteRead]:
+        """Any number of symbols, split into requests of at most MAX_QUOTE_SYMBOLS."""
+        quotes = []
+        for chunk in _chunks(_normalize_symbols(symbols)):
+            quotes.extend(self.call(_Calls.get_quotes(chunk)))
+        return quotes
+
+    def get_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        return {quote.Symbol: quote.Price for quote in self.get_quotes(symbols)}
+
+    # Alerts
+    def get_alerts(self, unread_only: bool = False) -> List[AlertRead]:
+        return self.call(_Calls.get_alerts(unread_only))
+
+    def mark_alert_read(self, alert_id: int):
+        return self.call(_Calls.mark_alert_read(alert_id))
+
+
+class AsyncStockApiClient:
+    """
+    asyncio client with the same methods as StockApiClient, plus batch helpers that
+    send their requests concurrently. Use one instance per event loop:
+
+        async with AsyncStockApiClient() as api:
+            user, holdings, valuation = await api.get_portfolio_snapshot(user_id)
+    """
+    def __init__(self, base_url: str = API_URL, timeout=DEFAULT_TIMEOUT, retries: int = RETRIES, pool_size: int = POOL_SIZE, http2: bool = HTTP2):
+        self.retries = retries
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.http = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            timeout=timeout,
+            headers={"Accept": "application/json"},
+            transport=httpx.AsyncHTTPTransport(retries=retries, http2=http2, limits=limits),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.http.aclose()
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        for attempt in range(self.retries + 1):
+            response = await self.http.request(method, path, **kwargs)
+            if not _should_retry(method, response, attempt, self.retries):
+                return response
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+        return response
+
+    async def call(self, call: Call):
+        response = await self.request(call.method, call.path, params=call.params, json=call.body)
+        _check(response)
+        return call.parse(response.json()) if call.parse else None
+
+    # Users
+    async def create_user(self, username: str, email: str, password: str) -> UserRead:
+        return await self.call(_Calls.create_user(username, email, password))
+
+    async def login(self, username: str, password: str) -> UserRead:
+        return await self.call(_Calls.login(username, password))
+
+    async def get_users(self) -> List[UserRead]:
+        return await self.call(_Calls.get_users())
+
+    async def get_user(self, user_id: int) -> UserRead:
+        return await self.call(_Calls.get_user(user_id))
+
+    async def update_user(self, user_id: int, username: str, email: str) -> UserRead:
+        return await self.call(_Calls.update_user(user_id, username, email))
+
+    async def delete_user(self, user_id: int):
+        return await self.call(_Calls.delete_user(user_id))
+
+    # Transactions
+    async def create_transaction(self, user_id: int, symbol: str, quantity: int, price: float) -> TransactionRead:
+        return await self.call(_Calls.create_transaction(user_id, symbol, quantity, price))
+
+    async def get_transaction(self, transaction_id: int) -> TransactionRead:
+        return await self.call(_Calls.get_transaction(transaction_id))
+
+    async def get_user_transactions(self, user_id: int, limit: Optional[int] = None, after_id: Optional[int] = None,
+                                    sort: str = "TransactionID", descending: bool = True, after_value=None) -> List[TransactionRead]:
+        return await self.call(_Calls.get_user_transactions(user_id, limit, after_id, sort, descending, after_value))
+
+    async def iter_user_transactions(self, user_id: int, limit: Optional[int] = None, after_id: Optional[int] = None,
+                                     sort: str = "TransactionID", descending: bool = True, after_value=None) -> AsyncIterator[TransactionRead]:
+        call = _Calls.stream_user_transactions(user_id, limit, after_id, sort, descending, after_value)
+        async with self.http.stream(call.method, call.path, params=call.params) as response:
+            if not response.is_success:
+                await response.aread()
+                _check(response)
+            async for line in response.aiter_lines():
+                if line:
+                    yield call.parse(json.loads(line))
+
+    # Portfolio
+    async def get_holdings(self, user_id: int, symbol: Optional[str] = None) -> List[HoldingRead]:
+        return await self.call(_Calls.get_holdings(user_id, symbol))
+
+    async def get_portfolio_valuation(self, user_id: int) -> PortfolioValuation:
+        return await self.call(_Calls.get_portfolio_valuation(user_id))
+
+    async def get_cost_basis(self, user_id: int, method: str = "average") -> List[PositionCostBasis]:
+        return await self.call(_Calls.get_cost_basis(user_id, method))
+
+    async def get_portfolio_history(self, user_id: int, period: str = "1y", interval: str = "1d") -> PortfolioHistory:
+        return await self.call(_Calls.get_portfolio_history(user_id, period, interval))
+
+    # Quotes
+    async def get_quotes(self, symbols: Iterable[str]) -> List[QuoteRead]:
+        """Any number of symbols; the MAX_QUOTE_SYMBOLS chunks are requested concurrently."""
+        pages = await asyncio.gather(*(self.call(_Calls.get_quotes(chunk)) for chunk in _chunks(_normalize_symbols(symbols))))
+        return [quote for page in pages for quote in page]
+
+    async def get_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        return {quote.Symbol: quote.Price for quote in await self.get_quotes(symbols)}
+
+    # Alerts
+    async def get_alerts(self, unread_only: bool = False) -> List[AlertRead]:
+        return await self.call(_Calls.get_alerts(unread_only))
+
+    async def mark_alert_read(self, alert_id: int):
+        return await self.call(_Calls.mark_alert_read(alert_id))
+
+    # Batch helpers
+    async def get_users_by_id(self, user_ids: Iterable[int]) -> List[UserRead]:
+        return list(await asyncio.gather(*(self.get_user(user_id) for user_id in user_ids)))
+
+    async def get_portfolio_snapshot(self, user_id: int):
+        """(user, holdings, valuation) with the three requests in flight together."""
+        return await asyncio.gather(self.get_user(user_id), self.get_holdings(user_id), self.get_portfolio_valuation(user_id))
+
+
+_client: Optional[StockApiClient] = None
+_client_lock = threading.Lock()
+
+def get_api_client() -> StockApiClient:
+    """Process-wide StockApiClient, so every view and tool shares one connection pool."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = StockApiClient()
+        return _client
+
+def set_api_client(client: StockApiClient):
+    """Replaces the process-wide client (e.g. to point at a test server)."""
+    global _client
+    with _client_lock:
+        _client = client
@@ -0,0 +1,130 @@
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional, Union, get_args, get_origin, get_type_hints
+
+# Client-side mirror of fastapi/app/domain/schemas.py (same names and PascalCase fields),
+# so views and tools use attributes instead of digging through JSON dicts.
+# Decimal fields (Balance, PricePerStock) arrive as strings and are parsed to float.
+
+
+@lru_cache(maxsize=None)
+def _field_types(cls):
+    hints = get_type_hints(cls)
+    return tuple((f.name, hints[f.name]) for f in fields(cls))
+
+def _convert(tp, value):
+    if value is None:
+        return None
+    origin = get_origin(tp)
+    if origin is Union: # Optional[X]
+        tp = next(arg for arg in get_args(tp) if arg is not type(None))
+        origin = get_origin(tp)
+    if origin is list:
+        item_type = get_args(tp)[0]
+        return [_convert(item_type, item) for item in value]
+    if tp is datetime:
+        return datetime.fromisoformat(value)
+    if tp is float:
+        return float(value)
+    if isinstance(tp, type) and issubclass(tp, ApiModel):
+        return tp.from_json(value)
+    return value
+
+
+@dataclass
+class ApiModel:
+    @classmethod
+    def from_json(cls, data: dict):
+        """Builds the model from a response object, ignoring fields it doesn't know."""
+        return cls(**{name: _convert(tp, data[name]) for name, tp in _field_types(cls) if name in data})
+
+    @classmethod
+    def from_json_list(cls, items: list) -> list:
+        return [cls.from_json(item) for item in items]
+
+
+# User Schemas
+@dataclass
+class UserRead(ApiModel):
+    UserID: int
+    Username: str
+    Email: str
+    Balance: float
+
+# Transaction Schemas
+@dataclass
+class TransactionRead(ApiModel):
+    TransactionID: int
+    UserID: int
+    StockSymbol: str
+    Quantity: int
+    PricePerStock: float
+    TransactionDate: datetime
+
+# Holding Schemas
+@dataclass
+class HoldingRead(ApiModel):
+    StockSymbol: str
+    Quantity: int
+
+# Quote Schemas
+@dataclass
+class QuoteRead(ApiModel):
+    Symbol: str
+    Price: float
+    AsOf: datetime
+
+# Valuation Schemas
+@dataclass
+class PositionValuation(ApiModel):
+    StockSymbol: str
+    Quantity: int
+    Price: Optional[float] # None when no quote was found
+    MarketValue: Optional[float]
+    AverageCost: float
+    CostBasis: float
+    UnrealizedPnL: Optional[float]
+    Weight: Optional[float]
+
+@dataclass
+class PortfolioValuation(ApiModel):
+    UserID: int
+    AsOf: datetime
+    TotalMarketValue: float
+    TotalCostBasis: float
+    TotalUnrealizedPnL: float
+    Positions: List[PositionValuation] = field(default_factory=list)
+
+# Cost Basis Schemas
+@dataclass
+class PositionCostBasis(ApiModel):
+    StockSymbol: str
+    Quantity: int
+    AverageCost: float
+    CostBasis: float
+    RealizedPnL: float
+
+# History Schemas
+@dataclass
+class PortfolioHistoryPoint(ApiModel):
+    Date: datetime
+    Value: float
+    Invested: float
+
+@dataclass
+class PortfolioHistory(ApiModel):
+    UserID: int
+    Period: str
+    Interval: str
+    Points: List[PortfolioHistoryPoint] = field(default_factory=list)
+
+# Alerts (served straight from the SentimentAlerts table, hence snake_case)
+@dataclass
+class AlertRead(ApiModel):
+    id: int
+    stock_symbol: str
+    sentiment_score: float
+    headline: str
+    timestamp: Optional[datetime] = None
+    is_read: int = 0
@@ -1,9 +1,10 @@
 import hashlib  # For hashing the password for comparison
-import requests
+import httpx
 from PySide6.QtWidgets import QMainWindow, QMessageBox
 from view.login import Ui_MainWindow
 from presenter.main_presenter import MainWindow
 import model.user
+from model.stock_api import ApiError, get_api_client
 
 
 def hash_password(password):
@@ -13,30 +14,23 @@ def hash_password(password):
 
 def check_credentials(username, password):
     try:
-        # Prepare the login payload
-        payload = {
-            "Username": username,
-            "Password": password
-        }
-
-        # Make a POST request to the login endpoint
-        response = requests.post('http://localhost:8000/api/v1/login', json=payload)
-        
-        if response.status_code == 200:
-            user_data = response.json()
-            # Save user data locally
-            model.user.save_username(username)
-            model.user.save_user_id(user_data['UserID'])
-            return True
-        elif response.status_code == 401:
+        # POST /login
+        user = get_api_client().login(username, password)
+
+        # Save user data locally
+        model.user.save_username(username)
+        model.user.save_user_id(user.UserID)
+        return True
+
+    except ApiError as e:
+        if e.status_code == 401:
             print("Login failed: Invalid credentials")
-            return False
         else:
-            print(f"Login failed with status: {response.status_code}")
-            print(response.text)
-            return False
+            print(f"Login failed with status: {e.status_code}")
+            print(e.detail)
+        return False
 
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Error while checking credentials: {e}")
         return False
 
@@ -1,13 +1,86 @@
-import sys
-import pandas as pd
-import os
-import yfinance as yf
+import threading
 import matplotlib.pyplot as plt
 from PySide6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QWidget, 
                                QComboBox, QRadioButton, QHBoxLayout, QLabel)
-from PySide6.QtCore import QTimer,QFile, QTextStream
+from PySide6.QtCore import QTimer,QFile, QTextStream, QObject, QRunnable, QThreadPool, Signal
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.dates as mdates
+import numpy as np
+from model.market_data import get_provider
+
+# Re-run the downsampling once this many raw bars (relative to the target point count) have been appended
+REDOWNSAMPLE_RATIO = 0.1
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling: keeps `threshold` points that preserve
+    the visual shape of the series (first and last points always kept).
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    every = (n - 2) / (threshold - 2)
+    edges = (np.arange(threshold - 1) * every).astype(int) + 1
+    edges[-1] = n - 1
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # Area of the triangle (selected point, candidate, average of the next bucket)
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return x[selected], y[selected]
+
+def to_plot_dates(index):
+    # Matplotlib date numbers (UTC) for a naive or tz-aware DatetimeIndex
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return mdates.date2num(index.values)
+
+class HistorySignals(QObject):
+    # request_id, data (None if nothing was returned)
+    finished = Signal(int, object)
+
+
+class HistoryWorker(QRunnable):
+    """Fetches one symbol's history on the thread pool, so the UI thread never waits on the network."""
+    def __init__(self, request_id, symbol, period, interval, cancelled):
+        super().__init__()
+        self.request_id = request_id
+        self.symbol = symbol
+        self.period = period
+        self.interval = interval
+        self.cancelled = cancelled # threading.Event set when a newer request replaces this one
+        self.signals = HistorySignals()
+
+    def run(self):
+        # A running download can't be interrupted, but a superseded request is dropped before and after it
+        if self.cancelled.is_set():
+            return
+        data = None
+        try:
+            print(f"Fetching data for {self.symbol} ({self.period})...")
+            data = get_provider().get_history(self.symbol, period=self.period, interval=self.interval)
+            if data.empty:
+                print(f"Warning: No data returned for {self.symbol}")
+                data = None
+            else:
+                print(f"Data fetched successfully. Rows: {len(data)}")
+        except Exception as e:
+            print(f"Error fetching stock data for {self.symbol}: {e}")
+            import traceback
+            traceback.print_exc()
+        if not self.cancelled.is_set():
+            self.signals.finished.emit(self.request_id, data)
+
 
 class StockGraph(QWidget):
     def __init__(self):
@@ -15,16 +88,12 @@ class StockGraph(QWidget):
         self.symbol = "NVDA"
         self.period = "1y"
 
-        # --- Fix for timezone cache (critical for Windows users with non-ASCII names) ---
-        cache_dir = os.path.join(os.getcwd(), "py_cache")
-        if not os.path.exists(cache_dir):
-            os.makedirs(cache_dir)
-        try:
-            yf.set_tz_cache_location(cache_dir)
-        except:
-            pass
+        self.thread_pool = QThreadPool()
+        self.thread_pool.setMaxThreadCount(2)
+        self.request_id = 0
+        self.worker = None
+        self.worker_cancelled = None
 
-        
         self.initUI()
         self.update_graph()
 
@@ -66,9 +135,9 @@ class StockGraph(QWidget):
         self.yearly_radio = QRadioButton("Yearly")
         self.yearly_radio.setChecked(True)
 
-        self.daily_radio.toggled.connect(lambda: self.update_period("1d"))
-        self.weekly_radio.toggled.connect(lambda: self.update_period("1wk"))
-        self.yearly_radio.toggled.connect(lambda: self.update_period("1y"))
+        self.daily_radio.toggled.connect(lambda checked: checked and self.update_period("1d"))
+        self.weekly_radio.toggled.connect(lambda checked: checked and self.update_period("1wk"))
+        self.yearly_radio.toggled.connect(lambda checked: checked and self.update_period("1y"))
 
         period_layout.addWidget(period_label)
         period_layout.addWidget(self.daily_radio)
@@ -84,6 +153,17 @@ class StockGraph(QWidget):
         self.figure, self.ax = plt.subplots()
         self.canvas = FigureCanvas(self.figure)
 
+        # One persistent line; refreshes update its data instead of re-plotting
+        self.line, = self.ax.plot([], [], color="green", label=self.symbol)
+        self.ax.xaxis_date()
+        self.ax.set_xlabel("Date", fontsize=12)
+        self.ax.set_ylabel("Price (USD)", fontsize=12)
+        self.ax.grid(True, linestyle='--', alpha=0.6)
+        self.series_key = None # (symbol, period) currently drawn
+        self.full_x = self.full_y = None # Full-resolution series
+        self.drawn_x = self.drawn_y = None # What the line shows (downsampled + raw tail)
+        self.raw_tail = 0 # Raw bars appended since the last downsampling
+
         layout.addLayout(top_layout)
         layout.addWidget(self.canvas)
         self.setLayout(layout)
@@ -112,69 +192,116 @@ class StockGraph(QWidget):
         self.update_graph()
 
     def fetch_stock_data(self):
-        try:
-            print(f"Fetching data for {self.symbol} ({self.period})...")
-            interval = "1d" if self.period == "1y" else "1h"
-            # auto_adjust=True helps get the actual price often expected
-            data = yf.download(self.symbol, period=self.period, interval=interval, progress=False, auto_adjust=False)
-            
-            if data.empty:
-                print(f"Warning: No data returned for {self.symbol}")
-                return None
-            else:
-                print(f"Data fetched successfully. Rows: {len(data)}")
-                return data
+        """Starts fetching the current symbol/period; on_data_ready draws the result."""
+        # Only the newest request matters: drop the previous one if it hasn't started yet
+        if self.worker is not None:
+            self.worker_cancelled.set()
+            try:
+                self.thread_pool.tryTake(self.worker)
+            except RuntimeError:
+                pass # Already finished and deleted by the pool
 
-        except Exception as e:
-            print(f"Error fetching stock data for {self.symbol}: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
+        self.request_id += 1
+        interval = "1d" if self.period == "1y" else "1h"
+        self.worker_cancelled = threading.Event()
+        self.worker = HistoryWorker(self.request_id, self.symbol, self.period, interval, self.worker_cancelled)
+        self.worker.signals.finished.connect(self.on_data_ready)
+        self.thread_pool.start(self.worker)
+
+        # Timer refreshes keep showing the current chart; a new symbol/period shows a loading title
+        if self.series_key != (self.symbol, self.period):
+            self.ax.set_title(f"Loading {self.symbol} ({self.period})...", fontsize=14, fontweight='bold')
+            self.canvas.draw_idle()
+
+    def on_data_ready(self, request_id, data):
+        if request_id != self.request_id:
+            return # Result of a request the user already moved away from
+        self.worker = None
+        self.draw_graph(data)
 
     def update_graph(self):
-        data = self.fetch_stock_data()
-        if data is not None and not data.empty:
-            self.ax.clear()
-            try:
-                # Robustly extract the 'Close' column handling MultiIndex
-                y_values = None
-                
-                # Check if columns are MultiIndex (common in new yfinance)
-                if isinstance(data.columns, pd.MultiIndex):
-                    try:
-                        # Try to access using the symbol if it exists in the columns level
-                        y_values = data["Close"][self.symbol]
-                    except KeyError:
-                        # Fallback: maybe it's just 'Close' or the structure is different
-                        if "Close" in data.columns:
-                             y_values = data["Close"]
-                else:
-                    # Flat Index
-                    if "Close" in data.columns:
-                        y_values = data["Close"]
-
-                if y_values is None:
-                    print(f"Error: Could not extract 'Close' prices. Columns: {data.columns}")
-                    self.ax.text(0.5, 0.5, "Error: Data format mismatch", ha='center', va='center')
-                    return
-
-                self.ax.plot(data.index, y_values, color="green", label=self.symbol)
-            except Exception as e:
-                print(f"Error plotting graph: {e}")
-                self.ax.text(0.5, 0.5, f"Error plotting: {e}", ha='center', va='center')
+        self.fetch_stock_data()
+
+    def draw_graph(self, data):
+        if data is None or data.empty or "Close" not in data.columns:
+            if data is not None and not data.empty:
+                print(f"Error: Could not extract 'Close' prices. Columns: {data.columns}")
+            self.ax.set_title(f"No data for {self.symbol} ({self.period})", fontsize=14, fontweight='bold')
+            self.canvas.draw_idle()
+            return
+
+        close = data["Close"].dropna()
+        x = to_plot_dates(close.index)
+        y = close.to_numpy(dtype=float)
+        if len(x) == 0:
+            return
+
+        key = (self.symbol, self.period)
+        if key == self.series_key and self.full_x is not None and self.full_x[0] <= x[-1] and x[0] <= self.full_x[-1]:
+            # Timer refresh of the same series: only the bars from the last drawn one onward are new
+            new = x >= self.full_x[-1]
+            self.append_bars(x[new], y[new])
+        else:
+            self.set_series(key, x, y, close.index.tz)
+        self.ax.set_title(f"Stock Price: {self.symbol} ({self.period})", fontsize=14, fontweight='bold')
+
+        # The period window slides forward; older points stay in the line but off screen
+        self.ax.set_xlim(x[0], x[-1])
+        visible = self.drawn_y[self.drawn_x >= x[0]]
+        low, high = visible.min(), visible.max()
+        pad = (high - low) * 0.05 or high * 0.01 or 1
+        self.ax.set_ylim(low - pad, high + pad)
+        self.canvas.draw_idle()
+
+    def target_points(self):
+        # About one point per horizontal pixel of the plot area
+        return max(int(self.canvas.width() * self.ax.get_position().width), 100)
+
+    def set_series(self, key, x, y, tz):
+        self.series_key = key
+        self.full_x, self.full_y = x, y
+        self.downsample()
+
+        self.line.set_label(self.symbol)
+        self.ax.legend()
+        if self.period == "1d":
+            self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M', tz=tz))
+        elif self.period == "1wk":
+            self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%a', tz=tz))
+        else:
+            self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y', tz=tz))
+
+    def downsample(self):
+        self.drawn_x, self.drawn_y = lttb(self.full_x, self.full_y, self.target_points())
+        self.raw_tail = 0
+        self.line.set_data(self.drawn_x, self.drawn_y)
+
+    def append_bars(self, x, y):
+        if len(x) == 0:
+            return
+        # The last drawn bar may have been incomplete; it is always the last full-resolution point
+        if x[0] == self.full_x[-1]:
+            self.full_y = self.full_y.copy()
+            self.full_y[-1] = y[0]
+            self.drawn_y = self.drawn_y.copy()
+            self.drawn_y[-1] = y[0]
+            x, y = x[1:], y[1:]
+
+        if len(x):
+            self.full_x = np.concatenate([self.full_x, x])
+            self.full_y = np.concatenate([self.full_y, y])
+            self.raw_tail += len(x)
+            if self.raw_tail > self.target_points() * REDOWNSAMPLE_RATIO:
+                self.downsample()
                 return
+            self.drawn_x = np.concatenate([self.drawn_x, x])
+            self.drawn_y = np.concatenate([self.drawn_y, y])
 
-            self.ax.set_title(f"Stock Price: {self.symbol} ({self.period})", fontsize=14, fontweight='bold')
-            self.ax.set_xlabel("Date", fontsize=12)
-            self.ax.set_ylabel("Price (USD)", fontsize=12)
-            self.ax.legend()
-            
-            if self.period == "1d":
-                self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
-            elif self.period == "1wk":
-                self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%a'))
-            else:
-                self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
+        self.line.set_data(self.drawn_x, self.drawn_y)
 
-            self.ax.grid(True, linestyle='--', alpha=0.6)
-            self.canvas.draw()
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        # Keep about one point per pixel when the chart gets wider or narrower
+        if self.full_x is not None and len(self.full_x) > min(len(self.drawn_x), self.target_points()):
+            self.downsample()
+            self.canvas.draw_idle()
@@ -1,27 +1,93 @@
 import sys
 import os
-import requests
-import yfinance as yf
+import httpx
 from PySide6.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem,
+    QApplication, QWidget, QVBoxLayout, QTableView, QAbstractItemView,
     QLabel, QPushButton, QComboBox, QSpinBox, QFormLayout,
     QMessageBox, QTabWidget, QSizePolicy ,QHeaderView
 )
-from PySide6.QtGui import QColor, QPalette
-from PySide6.QtCore import Qt, QDateTime, QFile, QTextStream
+from PySide6.QtGui import QPalette
+from PySide6.QtCore import Qt, QDateTime, QFile, QTextStream, QTimer
 from model.user import load_user_id
+from model.quotes import get_last_price
+from model.stock_api import ApiError, get_api_client
+from view.workers import run_in_background
+from view.transactions_model import TransactionsTableModel
 
-API_URL = "http://localhost:8000/api/v1"
 STOCK_SYMBOLS = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "TSMC", "ARM", "SSNLF", "NVDA", "ASML", "META"]
-
-# --- Fix for timezone cache (critical for Windows users with non-ASCII names) ---
-cache_dir = os.path.join(os.getcwd(), "py_cache")
-if not os.path.exists(cache_dir):
-    os.makedirs(cache_dir)
-try:
-    yf.set_tz_cache_location(cache_dir)
-except:
-    pass
+PRICE_DEBOUNCE_MS = 300 # Wait for the combo box to settle before fetching a price
+
+# Last price seen per symbol, shown right away while a fresh one is fetched
+_last_prices = {}
+
+
+def fetch_price(stock):
+    # Runs on a worker thread
+    print(f"Fetching price for {stock}...")
+    return stock, get_last_price(stock)
+
+
+def post_transaction(user_id, symbol, quantity, price, success_message):
+    """Returns (QMessageBox level, title, text) for the UI thread to show."""
+    try:
+        get_api_client().create_transaction(user_id, symbol, quantity, price)
+    except ApiError as e:
+        return "warning", "Error", f"Transaction failed.\nStatus code: {e.status_code}\nDetails: {e.detail}"
+    except httpx.HTTPError as e:
+        return "critical", "Error", f"Request failed: {e}"
+    return "information", "Success", success_message
+
+
+def buy_request(user_id, symbol, quantity, price):
+    # Runs on a worker thread: balance check, then the purchase
+    try:
+        print(f"Fetching user details for ID: {user_id}")
+        user = get_api_client().get_user(user_id)
+        print(f"User data received: {user}")
+        user_balance = user.Balance
+    except ApiError as e:
+        return "warning", "Error", f"Failed to fetch user details. Status: {e.status_code}"
+    except ValueError:
+        return "critical", "Error", "Invalid balance format received from server."
+    except httpx.HTTPError as e:
+        return "critical", "Error", f"Request failed: {e}"
+    except Exception as e:
+        return "critical", "Error", f"Unexpected error checking balance: {e}"
+
+    # Calculate the total cost of the purchase
+    total_cost = quantity * price
+
+    # Check if the user has enough balance
+    if user_balance < total_cost:
+        return ("warning", "Insufficient Balance",
+                f"You do not have enough balance to complete this purchase.\n"
+                f"Your balance: {user_balance:.2f}\n"
+                f"Total cost: {total_cost:.2f}")
+
+    # Proceed with the transaction if balance is sufficient
+    return post_transaction(user_id, symbol, quantity, price, "Stock purchased successfully!")
+
+
+def sell_request(user_id, symbol, quantity, price):
+    # Runs on a worker thread: ownership check, then the sale
+    try:
+        # Fetch the aggregated position for this symbol only
+        holdings = get_api_client().get_holdings(user_id, symbol=symbol)
+        user_stock_quantity = holdings[0].Quantity if holdings else 0
+    except (ApiError, httpx.HTTPError) as e:
+        return "critical", "Error", f"Request failed: {e}"
+    except Exception as e:
+        return "critical", "Error", f"An error occurred: {e}"
+
+    # בדוק אם למשתמש יש מספיק מניות
+    if user_stock_quantity < quantity:
+        return ("warning", "Error",
+                f"You do not have enough of the stock '{symbol}' to sell.\n"
+                f"Your quantity: {user_stock_quantity}\n"
+                f"Quantity to sell: {quantity}")
+
+    # Proceed with the transaction (negative quantity for selling)
+    return post_transaction(user_id, symbol, -1 * quantity, price, "Stock sold successfully!")
 
 
 class TransactionsWindow(QWidget):
@@ -36,6 +102,16 @@ class TransactionsWindow(QWidget):
         
         self.current_buy_price = 0
         self.current_sell_price = 0
+        self.pending_trades = set() # Tabs ("buy"/"sell") with an order in flight
+
+        # One debounce timer per tab: rapid combo changes trigger a single fetch
+        self.price_timers = {}
+        for source in ("buy", "sell"):
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.setInterval(PRICE_DEBOUNCE_MS)
+            timer.timeout.connect(lambda source=source: self.refresh_price(source))
+            self.price_timers[source] = timer
 
 
         # self.label = QLabel("User Transactions")
@@ -55,8 +131,16 @@ class TransactionsWindow(QWidget):
         self.setup_sell_tab()
         layout.addWidget(self.tabs)
 
-        self.table = QTableWidget()
+        # Rows are paged in from the server as the view scrolls, sorted server-side by the clicked column
+        self.transactions_model = TransactionsTableModel(get_api_client(), self)
+        self.table = QTableView()
+        self.table.setModel(self.transactions_model)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.verticalHeader().setVisible(False)  # ביטול המספרים של השורות
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)  # Uniform rows: no per-row height measuring
+        self.table.horizontalHeader().setSortIndicator(0, Qt.DescendingOrder)  # Newest first, as the server sends them
+        self.table.setSortingEnabled(True)
         self.table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)  # התאמת גודל הטבלה
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)  # התאמת עמודות לרוחב הטבלה
         layout.addWidget(self.table)
@@ -151,237 +235,113 @@ class TransactionsWindow(QWidget):
         self.sell_tab.setLayout(layout)
 
     def load_transactions(self):
-        try:
-            user_id = load_user_id()
-            response = requests.get(f"{API_URL}/users/{user_id}/transactions")
-            if response.status_code == 200:
-                transactions = response.json()
-                self.populate_table(transactions)
-            else:
-                layout = self.layout()
-                # self.label.setText("Failed to load transactions") # Label commented out in init
-        except requests.exceptions.RequestException as e:
-            pass # self.label.setText(f"Error: {e}")
-
-
-    def populate_table(self, transactions):
-        # user_id = load_user_id() 
-        # filtered_transactions = [t for t in transactions if t["userID"] == user_id]  # Fetching by user now
-        sorted_transactions = sorted(transactions, key=lambda x: x["TransactionID"], reverse=True)
-        self.table.setRowCount(len(sorted_transactions))
-        self.table.setColumnCount(5)
-        headers = ["Transaction ID", "User ID", "Stock Symbol", "Quantity", "Price Per Stock"]
-        self.table.setHorizontalHeaderLabels(headers)
-
-        for row, transaction in enumerate(sorted_transactions):
-            # Transaction ID
-            self.table.setItem(row, 0, self.create_readonly_item(str(transaction["TransactionID"])))
-
-            # User ID
-            self.table.setItem(row, 1, self.create_readonly_item(str(transaction["UserID"])))
-
-            # Stock Symbol
-            self.table.setItem(row, 2, self.create_readonly_item(transaction["StockSymbol"]))
-
-            # Quantity
-            quantity_item = self.create_readonly_item(str(transaction["Quantity"]))
-            self.table.setItem(row, 3, quantity_item)
-
-            # Price Per Stock
-            price_item = self.create_readonly_item(str(transaction["PricePerStock"]))
-            self.table.setItem(row, 4, price_item)
-
-            # Set background color for the entire row
-            if transaction["Quantity"] > 0:  # ערך חיובי
-                background_color = QColor("#e8f5e9")  # ירוק בהיר
-            elif transaction["Quantity"] < 0:  # ערך שלילי
-                background_color = QColor("#ffebee")  # אדום בהיר
-            else:
-                background_color = QColor("#ffffff")  # לבן (ברירת מחדל)
-
-            # Apply the background color to all cells in the row
-            for column in range(5):  # מספר העמודות בטבלה
-                self.table.item(row, column).setBackground(background_color)
-
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.resizeColumnsToContents()
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-
-    def create_readonly_item(self, text):
-        item = QTableWidgetItem(text)
-        item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-        item.setTextAlignment(Qt.AlignCenter)  # יישור הטקסט למרכז
-
-        return item
+        self.transactions_model.reload(load_user_id())
 
-    def update_price(self, source="buy"):
+    def price_widgets(self, source):
         if source == "buy":
-            stock = self.buy_stock_symbol.currentText()
-            label = self.buy_price_label
-        else:
-            stock = self.sell_stock_symbol.currentText()
-            label = self.sell_price_label
-
-        try:
-            print(f"Fetching price for {stock}...")
-            stock_data = yf.Ticker(stock)
-            history = stock_data.history(period="1d")
-            
-            if history.empty:
-                print(f"Warning: History empty for {stock}")
-                label.setText("Price: N/A")
-                price = 0
-            else:
-                price = history["Close"].iloc[-1]
-                print(f"Price for {stock}: {price}")
-                label.setText(f"Price: {price:.2f}")
-
-            if source == "buy":
-                self.current_buy_price = price
-            else:
-                self.current_sell_price = price
-        except Exception as e:
-            print(f"Error fetching price for {stock}: {e}")
-            label.setText("Price: Error")
-            if source == "buy":
-                self.current_buy_price = 0
-            else:
-                self.current_sell_price = 0
+            return self.buy_stock_symbol.currentText(), self.buy_price_label
+        return self.sell_stock_symbol.currentText(), self.sell_price_label
 
+    def trade_button(self, source):
+        return self.buy_button if source == "buy" else self.sell_button
 
-    def buy_stock(self):
-        user_id = load_user_id()
-        
-        # Fetch user details to get the balance
-        try:
-            print(f"Fetching user details for ID: {user_id}")
-            user_response = requests.get(f"{API_URL}/users/{user_id}")
-            if user_response.status_code == 200:
-                user_data = user_response.json()
-                print(f"User data received: {user_data}")
-                user_balance = float(user_data.get("Balance", 0.0)) # Cast to float
-            else:
-                QMessageBox.warning(self, "Error", f"Failed to fetch user details. Status: {user_response.status_code}")
-                return
-        except ValueError:
-            QMessageBox.critical(self, "Error", "Invalid balance format received from server.")
-            return
-        except requests.exceptions.RequestException as e:
-            QMessageBox.critical(self, "Error", f"Request failed: {e}")
-            return
-        except Exception as e:
-             QMessageBox.critical(self, "Error", f"Unexpected error checking balance: {e}")
-             return
+    def set_current_price(self, source, price):
+        # Only a freshly fetched price is tradable (0 while fetching or unavailable)
+        if source == "buy":
+            self.current_buy_price = price
+        else:
+            self.current_sell_price = price
+        self.update_trade_button(source)
 
-        # Calculate the total cost of the purchase
-        total_cost = self.buy_quantity.value() * self.current_buy_price
+    def update_trade_button(self, source):
+        price = self.current_buy_price if source == "buy" else self.current_sell_price
+        self.trade_button(source).setEnabled(price > 0 and source not in self.pending_trades)
 
+    def update_price(self, source="buy"):
+        stock, label = self.price_widgets(source)
+
+        # Show the last known price at once, then refresh it once the selection settles.
+        # Trading waits for the fresh price, so an order never goes out at the cached one.
+        cached = _last_prices.get(stock)
+        if cached is not None:
+            label.setText(f"Price: {cached:.2f} (updating...)")
+        else:
+            label.setText("Price: Fetching...")
+        self.set_current_price(source, 0)
+
+        self.price_timers[source].start()
+
+    def refresh_price(self, source):
+        stock, _ = self.price_widgets(source)
+        run_in_background(
+            fetch_price, stock,
+            on_finished=lambda result, source=source: self.on_price_fetched(source, *result),
+            on_failed=lambda error, source=source, stock=stock: self.on_price_failed(source, stock, error),
+        )
+
+    def on_price_fetched(self, source, stock, price):
+        if price is not None:
+            _last_prices[stock] = price
+
+        current_stock, label = self.price_widgets(source)
+        if current_stock != stock:
+            return # The user picked another symbol meanwhile; its own fetch will update the label
+
+        if price is None:
+            print(f"Warning: No price for {stock}")
+            label.setText("Price: N/A")
+            self.set_current_price(source, 0)
+        else:
+            print(f"Price for {stock}: {price}")
+            label.setText(f"Price: {price:.2f}")
+            self.set_current_price(source, price)
 
-        # Check if the user has enough balance
-        if user_balance < total_cost:
-            QMessageBox.warning(self, "Insufficient Balance", 
-                                f"You do not have enough balance to complete this purchase.\n"
-                                f"Your balance: {user_balance:.2f}\n"
-                                f"Total cost: {total_cost:.2f}")
+    def on_price_failed(self, source, stock, error):
+        current_stock, label = self.price_widgets(source)
+        if current_stock != stock:
             return
+        print(f"Error fetching price for {stock}: {error}")
+        if stock in _last_prices:
+            label.setText(f"Price: {_last_prices[stock]:.2f} (cached, trading paused)")
+        else:
+            label.setText("Price: Error")
+        self.set_current_price(source, 0)
 
-        # Proceed with the transaction if balance is sufficient
-        transaction_data = {
-            "UserID": user_id,
-            "StockSymbol": self.buy_stock_symbol.currentText(),
-            "Quantity": self.buy_quantity.value(),
-            "PricePerStock": round(self.current_buy_price, 2)
-        }
+    def buy_stock(self):
+        if self.current_buy_price <= 0:
+            QMessageBox.warning(self, "Error", "The price is not available yet. Please try again in a moment.")
+            return
 
-        try:
-            # Send the transaction
-            response = requests.post(f"{API_URL}/transactions", json=transaction_data, headers={"Content-Type": "application/json"})
-            if response.status_code == 201:
-                QMessageBox.information(self, "Success", "Stock purchased successfully!")
-                self.load_transactions()
-            else:
-                 error_msg = f"Status code: {response.status_code}"
-                 try:
-                     error_msg += f"\nDetails: {response.json()}"
-                 except:
-                     error_msg += f"\nResponse: {response.text}"
-                 QMessageBox.warning(self, "Error", f"Transaction failed.\n{error_msg}")
-        except requests.exceptions.RequestException as e:
-            QMessageBox.critical(self, "Error", f"Request failed: {e}")
+        self.start_trade("buy")
+        run_in_background(
+            buy_request, load_user_id(), self.buy_stock_symbol.currentText(), self.buy_quantity.value(), self.current_buy_price,
+            on_finished=lambda result: self.on_trade_finished("buy", result),
+            on_failed=lambda error: self.on_trade_finished("buy", ("critical", "Error", f"Unexpected error: {error}")),
+        )
 
     def sell_stock(self):
-        user_id = load_user_id()
-        stock_symbol = self.sell_stock_symbol.currentText()
-        sell_quantity = self.sell_quantity.value()
-
-        # בדוק אם למשתמש יש מספיק מניות
-        user_stock_quantity = self.get_user_stock_quantity(user_id, stock_symbol)
-        if user_stock_quantity < sell_quantity:
-            QMessageBox.warning(self, "Error", 
-                                f"You do not have enough of the stock '{stock_symbol}' to sell.\n"
-                                f"Your quantity: {user_stock_quantity}\n"
-                                f"Quantity to sell: {sell_quantity}")
+        if self.current_sell_price <= 0:
+            QMessageBox.warning(self, "Error", "The price is not available yet. Please try again in a moment.")
             return
 
-        # Proceed with the transaction
-        transaction_data = {
-            "UserID": user_id,
-            "StockSymbol": stock_symbol,
-            "Quantity": -1 * sell_quantity,  # Negative quantity for selling
-            "PricePerStock": round(self.current_sell_price, 2)
-        }
-
-        try:
-            # Send the transaction
-            response = requests.post(f"{API_URL}/transactions", json=transaction_data, headers={"Content-Type": "application/json"})
-            if response.status_code == 201:
-                QMessageBox.information(self, "Success", "Stock sold successfully!")
-                self.load_transactions()
-            else:
-                 error_msg = f"Status code: {response.status_code}"
-                 try:
-                     error_msg += f"\nDetails: {response.json()}"
-                 except:
-                     error_msg += f"\nResponse: {response.text}"
-                 QMessageBox.warning(self, "Error", f"Transaction failed.\n{error_msg}")
-        except requests.exceptions.RequestException as e:
-            QMessageBox.critical(self, "Error", f"Request failed: {e}")
-
-    def get_user_stock_quantity(self, user_id, stock_symbol):
-        try:
-            # Fetch user transactions directly
-            response = requests.get(f"{API_URL}/users/{user_id}/transactions")
-            response.raise_for_status()  
-
-            transactions = response.json()
-
-            # Filter by stockSymbol
-            stock_transactions = [
-                t for t in transactions
-                if t.get("StockSymbol") == stock_symbol
-            ]
-
-            total_quantity = sum(t.get("Quantity", 0) for t in stock_transactions)
-            return total_quantity
-
-        except requests.exceptions.RequestException as e:
-            QMessageBox.critical(self, "Error", f"Request failed: {e}")
-            return 0
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"An error occurred: {e}")
-            return 0
-
-    
-    def send_transaction(self, transaction_data, success_message):
-        try:
-            response = requests.post(API_URL, json=transaction_data, headers={"Content-Type": "application/json"})
-            if response.status_code == 201:
-                QMessageBox.information(self, "Success", success_message)
-                self.load_transactions()
-            else:
-                QMessageBox.warning(self, "Error", "Transaction failed.")
-        except requests.exceptions.RequestException as e:
-            QMessageBox.critical(self, "Error", f"Request failed: {e}")
+        self.start_trade("sell")
+        run_in_background(
+            sell_request, load_user_id(), self.sell_stock_symbol.currentText(), self.sell_quantity.value(), self.current_sell_price,
+            on_finished=lambda result: self.on_trade_finished("sell", result),
+            on_failed=lambda error: self.on_trade_finished("sell", ("critical", "Error", f"Unexpected error: {error}")),
+        )
+
+    def start_trade(self, source):
+        self.pending_trades.add(source)
+        self.update_trade_button(source)
+
+    def on_trade_finished(self, source, result):
+        self.pending_trades.discard(source)
+        self.update_trade_button(source)
+        level, title, text = result
+        getattr(QMessageBox, level)(self, title, text)
+        if level == "information":
+            self.load_transactions()
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -232,7 +232,7 @@ class Ui_MainWindow(object):
 
         
         # Add UserDetailsWindow to the last page (page_4)
-        self.user_details_window = UserDetailsWindow(model.user.load_user_id(), "http://localhost:8000/api/v1/users")  # Create an instance of UserDetailsWindow
+        self.user_details_window = UserDetailsWindow(model.user.load_user_id())  # Create an instance of UserDetailsWindow
         self.customers_layout = QVBoxLayout(self.page_4)  # Create a layout for the last page
         self.customers_layout.addWidget(self.user_details_window)  # Add the UserDetailsWindow widget to the layout
         self.page_4.setLayout(self.customers_layout)  # Set the layout for the last page
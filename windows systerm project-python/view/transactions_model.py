@@ -0,0 +1,194 @@
+import numpy as np
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PySide6.QtGui import QBrush, QColor
+
+from view.workers import run_in_background
+
+# (header, TransactionRead field) per column; the field is also the server-side sort key
+COLUMNS = [
+    ("Transaction ID", "TransactionID"),
+    ("User ID", "UserID"),
+    ("Stock Symbol", "StockSymbol"),
+    ("Quantity", "Quantity"),
+    ("Price Per Stock", "PricePerStock"),
+]
+
+PAGE_SIZE = 1000 # Rows per request (the server's maximum page size)
+
+BUY_BRUSH = QBrush(QColor("#e8f5e9")) # ירוק בהיר
+SELL_BRUSH = QBrush(QColor("#ffebee")) # אדום בהיר
+
+
+class TransactionsTableModel(QAbstractTableModel):
+    """
+    A user's transactions for a QTableView, loaded page by page as the view scrolls
+    (canFetchMore/fetchMore) and sorted by the server.
+
+    Rows are kept in one numpy array per column (symbols as codes into a small list),
+    about 28 bytes a row, and cell text and colors are only produced in data() for
+    the rows the view paints.
+    """
+    def __init__(self, api, parent=None):
+        super().__init__(parent)
+        self.api = api # StockApiClient
+        self.user_id = None
+        self.sort_field = "TransactionID"
+        self.descending = True
+
+        self.clear_columns()
+
+        self.loading = False
+        self.exhausted = True # Nothing to fetch until reload() sets a user
+        self.generation = 0 # Drops pages requested before the last reload/sort
+
+    # --- Qt model interface ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section][0]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return str(self.ids[row])
+            if column == 1:
+                return str(self.user_ids[row])
+            if column == 2:
+                return self.symbols[self.symbol_codes[row]]
+            if column == 3:
+                return str(self.quantities[row])
+            return f"{self.prices[row]:.2f}"
+
+        if role == Qt.BackgroundRole:
+            quantity = self.quantities[row]
+            if quantity > 0:
+                return BUY_BRUSH
+            if quantity < 0:
+                return SELL_BRUSH
+        return None
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable # Read-only
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.loading and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self.loading = True
+
+        # Keyset cursor: the last loaded row's id and sort value
+        after_id = after_value = None
+        if self.count:
+            last = self.count - 1
+            after_id = int(self.ids[last])
+            after_value = self.value(last, self.sort_field)
+
+        generation = self.generation
+        run_in_background(
+            self.api.get_user_transactions, self.user_id, PAGE_SIZE, after_id, self.sort_field, self.descending, after_value,
+            on_finished=lambda page: self.append_page(generation, page),
+            on_failed=lambda error: self.on_page_failed(generation, error),
+        )
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        field = COLUMNS[column][1]
+        if field == "UserID":
+            field = "TransactionID" # Every row has the same user, so only the tie-breaker orders them
+        descending = order == Qt.DescendingOrder
+        if (field, descending) == (self.sort_field, self.descending):
+            return
+        self.sort_field, self.descending = field, descending
+        self.reload(self.user_id)
+
+    # --- Loading ---
+
+    def reload(self, user_id):
+        """Drops the loaded rows and starts again from the first page (e.g. after a new trade)."""
+        self.beginResetModel()
+        self.generation += 1
+        self.user_id = user_id
+        self.clear_columns()
+        self.loading = False
+        self.exhausted = user_id is None
+        self.endResetModel()
+        self.fetchMore()
+
+    def append_page(self, generation, page):
+        if generation != self.generation:
+            return
+        self.loading = False
+        self.exhausted = len(page) < PAGE_SIZE
+        if not page:
+            return
+
+        start, n = self.count, len(page)
+        self.reserve(start + n)
+        end = start + n
+        self.ids[start:end] = [t.TransactionID for t in page]
+        self.user_ids[start:end] = [t.UserID for t in page]
+        self.symbol_codes[start:end] = [self.symbol_code(t.StockSymbol) for t in page]
+        self.quantities[start:end] = [t.Quantity for t in page]
+        self.prices[start:end] = [t.PricePerStock for t in page]
+
+        self.beginInsertRows(QModelIndex(), start, end - 1)
+        self.count = end
+        self.endInsertRows()
+
+    def on_page_failed(self, generation, error):
+        if generation != self.generation:
+            return
+        print(f"Failed to load transactions: {error}")
+        self.loading = False
+        self.exhausted = True # Don't retry on every scroll; reload() starts over
+
+    # --- Column storage ---
+
+    def clear_columns(self):
+        self.count = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.user_ids = np.empty(0, dtype=np.int32)
+        self.symbol_codes = np.empty(0, dtype=np.int32)
+        self.quantities = np.empty(0, dtype=np.int32)
+        self.prices = np.empty(0, dtype=np.float64)
+        self.symbols = [] # code -> symbol
+        self.symbol_index = {} # symbol -> code
+
+    def reserve(self, size):
+        # Grow every column together, doubling so appends stay amortized O(1)
+        if size <= len(self.ids):
+            return
+        capacity = max(size, 2 * len(self.ids), PAGE_SIZE)
+        for name in ("ids", "user_ids", "symbol_codes", "quantities", "prices"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def symbol_code(self, symbol):
+        code = self.symbol_index.get(symbol)
+        if code is None:
+            code = self.symbol_index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return code
+
+    def value(self, row, field):
+        if field == "TransactionID":
+            return int(self.ids[row])
+        if field == "StockSymbol":
+            return self.symbols[self.symbol_codes[row]]
+        if field == "Quantity":
+            return int(self.quantities[row])
+        return f"{self.prices[row]:.2f}"
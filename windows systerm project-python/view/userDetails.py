@@ -1,13 +1,23 @@
 import sys
-import requests
-import yfinance as yf
-from PySide6.QtCore import Qt, QFile, QTextStream, QSize
+import httpx
+from PySide6.QtCore import Qt, QFile, QTextStream, QSize, QThreadPool
 from PySide6.QtGui import QFont
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel, QLineEdit,
     QPushButton, QHBoxLayout, QMessageBox, QFrame, QSpacerItem, QSizePolicy,
     QTableWidget, QTableWidgetItem, QHeaderView
 )
+from model.quotes import get_last_prices
+from model.stock_api import ApiError, get_api_client
+from view.workers import run_in_background
+
+PRICE_BATCH_SIZE = 5 # Symbols per background price request
+PRICE_WORKERS = 4 # Price requests in flight at once
+
+
+def fetch_prices(api, symbols):
+    # Runs on a worker thread
+    return symbols, get_last_prices(symbols, api)
 
 
 class UserDetailsWindow(QMainWindow):
@@ -15,11 +25,15 @@ class UserDetailsWindow(QMainWindow):
     BUTTON_WIDTH = 75
 
    
-    def __init__(self, user_id, api_url, parent=None):
+    def __init__(self, user_id, api=None, parent=None):
         super().__init__(parent)
         self.user_id = user_id
-        self.api_url = api_url
+        self.api = api or get_api_client() # StockApiClient
         self.editable_fields = []
+        self.price_pool = QThreadPool(self)
+        self.price_pool.setMaxThreadCount(PRICE_WORKERS)
+        self.portfolio_rows = {} # symbol -> (row, quantity)
+        self.portfolio_generation = 0 # Drops price results of an older load_portfolio()
         self.init_ui()
         self.load_user_details()
         self.load_portfolio()
@@ -176,66 +190,82 @@ class UserDetailsWindow(QMainWindow):
         button.style().polish(button)
         
     def load_user_details(self):
-        try:
-            response = requests.get(f"{self.api_url}/{self.user_id}")
-            if response.status_code == 200:
-                user_data = response.json()
-                self.username.setText(user_data.get("Username", ""))
-                self.email.setText(user_data.get("Email", ""))
-                balance = float(user_data.get("Balance", 0))
-                self.balance_label.setText(f"${balance:,.2f}")
-                self.reset_edit_states()
-            else:
-                 QMessageBox.warning(self, "Error", f"Failed to load details: {response.status_code}")
-
-        except requests.exceptions.RequestException as e:
-            QMessageBox.critical(self, "Connection Error", f"Failed to connect to API: {e}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"An error occurred loading details: {str(e)}")
+        run_in_background(self.api.get_user, self.user_id, on_finished=self.show_user_details, on_failed=self.on_user_details_failed)
+
+    def show_user_details(self, user):
+        self.username.setText(user.Username)
+        self.email.setText(user.Email)
+        self.balance_label.setText(f"${user.Balance:,.2f}")
+        self.reset_edit_states()
+
+    def on_user_details_failed(self, error):
+        if isinstance(error, ApiError):
+            QMessageBox.warning(self, "Error", f"Failed to load details: {error.status_code}")
+        elif isinstance(error, httpx.HTTPError):
+            QMessageBox.critical(self, "Connection Error", f"Failed to connect to API: {error}")
+        else:
+            QMessageBox.critical(self, "Error", f"An error occurred loading details: {str(error)}")
 
 
     def load_portfolio(self):
-        try:
-            response = requests.get(f"{self.api_url}/{self.user_id}/transactions")
-            if response.status_code == 200:
-                transactions = response.json()
-                
-                # Aggregate holdings
-                holdings = {}
-                for t in transactions:
-                    symbol = t['StockSymbol'].upper()
-                    qty = t['Quantity']
-                    holdings[symbol] = holdings.get(symbol, 0) + qty
-                
-                # Filter > 0
-                current_holdings = {k: v for k, v in holdings.items() if v > 0}
-                
-                self.portfolio_table.setRowCount(len(current_holdings))
-                
-                for row, (symbol, qty) in enumerate(current_holdings.items()):
-                    self.portfolio_table.setItem(row, 0, QTableWidgetItem(symbol))
-                    self.portfolio_table.setItem(row, 1, QTableWidgetItem(str(qty)))
-                    
-                    # Fetch price
-                    try:
-                        ticker = yf.Ticker(symbol)
-                        history = ticker.history(period="1d")
-                        if not history.empty:
-                            price = history["Close"].iloc[-1]
-                            value = price * qty
-                            self.portfolio_table.setItem(row, 2, QTableWidgetItem(f"${price:.2f}"))
-                            self.portfolio_table.setItem(row, 3, QTableWidgetItem(f"${value:.2f}"))
-                        else:
-                            self.portfolio_table.setItem(row, 2, QTableWidgetItem("N/A"))
-                            self.portfolio_table.setItem(row, 3, QTableWidgetItem("N/A"))
-                    except:
-                         self.portfolio_table.setItem(row, 2, QTableWidgetItem("Error"))
-                         self.portfolio_table.setItem(row, 3, QTableWidgetItem("Error"))
+        # Holdings first (aggregated server-side, only quantities > 0); prices follow per batch
+        self.portfolio_generation += 1
+        generation = self.portfolio_generation
+        run_in_background(
+            self.api.get_holdings, self.user_id,
+            on_finished=lambda holdings: self.show_holdings(generation, holdings),
+            on_failed=self.on_holdings_failed,
+        )
+
+    def on_holdings_failed(self, error):
+        # Silently fail or log for now
+        if isinstance(error, ApiError):
+            print(f"Failed to load holdings: {error.status_code}")
+        else:
+            print(f"Error loading portfolio: {error}")
+
+    def show_holdings(self, generation, holdings):
+        if generation != self.portfolio_generation:
+            return
+        current_holdings = {h.StockSymbol.upper(): h.Quantity for h in holdings}
+
+        # Every row is shown right away with a placeholder price
+        self.portfolio_rows = {}
+        self.portfolio_table.setRowCount(len(current_holdings))
+        for row, (symbol, qty) in enumerate(current_holdings.items()):
+            self.portfolio_rows[symbol] = (row, qty)
+            self.portfolio_table.setItem(row, 0, QTableWidgetItem(symbol))
+            self.portfolio_table.setItem(row, 1, QTableWidgetItem(str(qty)))
+            self.portfolio_table.setItem(row, 2, QTableWidgetItem("Loading..."))
+            self.portfolio_table.setItem(row, 3, QTableWidgetItem("Loading..."))
+
+        # Prices are fetched in small batches on the pool and filled in as each batch arrives
+        symbols = list(current_holdings)
+        for i in range(0, len(symbols), PRICE_BATCH_SIZE):
+            batch = symbols[i:i + PRICE_BATCH_SIZE]
+            run_in_background(
+                fetch_prices, self.api, batch,
+                on_finished=lambda result, generation=generation: self.show_prices(generation, *result),
+                on_failed=lambda error, generation=generation, batch=batch: self.show_prices(generation, batch, None),
+                pool=self.price_pool,
+            )
+
+    def show_prices(self, generation, symbols, prices):
+        if generation != self.portfolio_generation:
+            return
+        for symbol in symbols:
+            row, qty = self.portfolio_rows[symbol]
+            if prices is None:
+                self.portfolio_table.setItem(row, 2, QTableWidgetItem("Error"))
+                self.portfolio_table.setItem(row, 3, QTableWidgetItem("Error"))
+            elif prices.get(symbol) is not None:
+                price = prices[symbol]
+                value = price * qty
+                self.portfolio_table.setItem(row, 2, QTableWidgetItem(f"${price:.2f}"))
+                self.portfolio_table.setItem(row, 3, QTableWidgetItem(f"${value:.2f}"))
             else:
-                # Silently fail or log for now
-                print(f"Failed to load transactions: {response.status_code}")
-        except Exception as e:
-            print(f"Error loading portfolio: {e}")
+                self.portfolio_table.setItem(row, 2, QTableWidgetItem("N/A"))
+                self.portfolio_table.setItem(row, 3, QTableWidgetItem("N/A"))
 
 
     def save_user_details(self):
@@ -246,11 +276,6 @@ class UserDetailsWindow(QMainWindow):
             QMessageBox.warning(self, "Validation Error", "Username and Email cannot be empty.")
             return
 
-        payload = {
-            "Username": username_text,
-            "Email": email_text
-        }
-
         self.save_button.setEnabled(False)
         self.save_button.setText("Saving...")
         self.save_button.style().unpolish(self.save_button)
@@ -258,15 +283,13 @@ class UserDetailsWindow(QMainWindow):
         QApplication.processEvents()
 
         try:
-            response = requests.put(f"{self.api_url}/{self.user_id}", json=payload)
-            
-            if response.status_code in [200, 204]:
-                QMessageBox.information(self, "Success", "User details updated successfully.")
-                self.load_user_details() # Reload to refresh and reset
-            else:
-                QMessageBox.critical(self, "API Error", f"Failed to update user details. Status: {response.status_code}")
+            self.api.update_user(self.user_id, username_text, email_text)
+            QMessageBox.information(self, "Success", "User details updated successfully.")
+            self.load_user_details() # Reload to refresh and reset
 
-        except requests.exceptions.RequestException as e:
+        except ApiError as e:
+            QMessageBox.critical(self, "API Error", f"Failed to update user details. Status: {e.status_code}")
+        except httpx.HTTPError as e:
             QMessageBox.critical(self, "Connection Error", f"Failed to save data: {e}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An error occurred during save: {str(e)}")
@@ -298,7 +321,6 @@ class UserDetailsWindow(QMainWindow):
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     user_id_to_show = 4
-    api_endpoint = "http://localhost:8000/api/v1/users" # Corrected default for testing
-    window = UserDetailsWindow(user_id_to_show, api_endpoint)
+    window = UserDetailsWindow(user_id_to_show) # API_URL env var selects the server
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,38 @@
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+
+class WorkerSignals(QObject):
+    finished = Signal(object) # Return value of the function
+    failed = Signal(object) # Exception raised by the function
+
+
+class FunctionWorker(QRunnable):
+    """Runs fn(*args) on a thread pool and reports the result through signals (delivered on the UI thread)."""
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            print(f"Background task {getattr(self.fn, '__name__', self.fn)} failed: {e}")
+            self.signals.failed.emit(e)
+            return
+        self.signals.finished.emit(result)
+
+
+def run_in_background(fn, *args, on_finished=None, on_failed=None, pool=None):
+    """
+    Starts fn(*args) on `pool` (the global QThreadPool by default). The callbacks run on
+    the UI thread, so they may touch widgets; fn itself must not.
+    """
+    worker = FunctionWorker(fn, *args)
+    if on_finished:
+        worker.signals.finished.connect(on_finished)
+    if on_failed:
+        worker.signals.failed.connect(on_failed)
+    (pool or QThreadPool.globalInstance()).start(worker)
+    return worker